@@ -0,0 +1,85 @@
+import os
+import sys
+import time
+import argparse
+
+from corpus import generate_program
+
+# Comparison of parser backends (parse.py --backend) - every backend parses the same inputs in this process,
+# its result (exit code and XML) is compared with the default backend and its parse time is summed
+# Inputs are programs from INPUTS/ and synthetic programs of bench/corpus.py
+# Usage: python bench/backends.py [--runs N] [--backend NAME] [--size N]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import parse
+
+# Returns list of (name, source) - test programs and synthetic programs of growing size
+def load_inputs(size):
+    inputs = []
+    for dirpath, _, filenames in os.walk(os.path.join(ROOT, "INPUTS")):
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            with open(path, encoding="utf-8") as filein:
+                inputs.append((os.path.relpath(path, ROOT), filein.read()))
+    for classes in (1, size, size * 4):
+        params = {"classes": classes, "methods": 10, "depth": 3, "chain": 4, "comments": 1}
+        inputs.append((f"corpus classes={classes}", generate_program(**params)))
+    inputs.sort()
+    return inputs
+
+# Returns (exit code, XML) of one parse
+def run_backend(source, backend_name):
+    try:
+        result = parse.parse_sol25(source, backend_name)
+        return 0, result.xml
+    except parse.ParseError as error:
+        return error.code, ""
+
+# Returns (best total time of runs, results of inputs)
+def measure_backend(inputs, backend_name, runs):
+    parse.get_backend(backend_name)
+    best = None
+    for _ in range(runs):
+        results = []
+        start = time.perf_counter()
+        for _, source in inputs:
+            results.append(run_backend(source, backend_name))
+        elapsed = time.perf_counter() - start
+        if((best is None) or (elapsed < best)):
+            best = elapsed
+    return best, results
+
+def main():
+    parser = argparse.ArgumentParser(description="Comparison of parser backends of parse.py")
+    parser.add_argument("--runs", type=int, default=3, help="runs over all inputs (best one is reported)")
+    parser.add_argument("--backend", action="append", choices=parse.BACKENDS, help="measure only given backends")
+    parser.add_argument("--size", type=int, default=5, help="classes of synthetic programs")
+    args = parser.parse_args()
+    # Parsy combinators are recursive
+    sys.setrecursionlimit(20000)
+
+    inputs = load_inputs(args.size)
+    names = [name for name in parse.BACKENDS if (args.backend is None) or (name in args.backend)]
+    if(parse.DEFAULT_BACKEND not in names):
+        names.insert(0, parse.DEFAULT_BACKEND)
+
+    measured = {}
+    for name in names:
+        try:
+            measured[name] = measure_backend(inputs, name, args.runs)
+        except ImportError as error:
+            print(f"{name}: not available ({error})")
+    reference = measured[parse.DEFAULT_BACKEND][1]
+
+    print(f"{len(inputs)} inputs, {sum(len(source) for _, source in inputs) / 1024:.1f} KB")
+    print(f"{'backend':<14}{'time [ms]':>11}{'ratio':>8}{'agree':>9}")
+    for name, (elapsed, results) in measured.items():
+        differ = [i for i, result in enumerate(results) if result != reference[i]]
+        ratio = elapsed / measured[parse.DEFAULT_BACKEND][0]
+        print(f"{name:<14}{elapsed * 1000:>11.1f}{ratio:>8.2f}{len(inputs) - len(differ):>5}/{len(inputs):<3}")
+        for i in differ:
+            print(f"    {inputs[i][0]}: exit code {results[i][0]} (expected {reference[i][0]})")
+
+if __name__ == "__main__":
+    main()
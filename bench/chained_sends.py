@@ -0,0 +1,43 @@
+import os
+import sys
+import time
+
+# Micro-benchmark of Transform_AST on deeply chained keyword sends
+# Every statement is a chain of nested keyword sends with several arguments (receivers and arguments are expressions)
+# Usage: python bench/chained_sends.py [nesting depth] [number of statements] [repeats]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# Tree of lark is needed, it is created by parser without inline transformer (standalone module is not used)
+os.environ["SOL25_STANDALONE"] = "0"
+import parse
+
+# Returns SOL25 program with statements of nested keyword sends
+def generate_program(depth, statements):
+    expr = "x"
+    for i in range(depth):
+        expr = f"({expr} at: {i} put: (y plus: {i}) with: y)"
+    body = "".join(f"r{i} := {expr}.\n" for i in range(statements))
+    return f"class Main : Object {{ run [ | x := 1. y := 2. {body} ] }}"
+
+def main():
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    statements = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    repeats = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+
+    source = generate_program(depth, statements)
+    tree = parse.create_parser(parse.grammar).parse(source)
+
+    sends = depth * statements * 2
+    best = None
+    for _ in range(repeats):
+        transformer = parse.Transform_AST(parse.Parse_Context())
+        start = time.perf_counter()
+        transformer.transform(tree)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"depth {depth}, statements {statements}, sends {sends}")
+    print(f"Transform_AST: {best * 1000:.1f} ms, {best / sends * 1e6:.2f} us per send")
+
+if __name__ == "__main__":
+    main()
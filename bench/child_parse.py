@@ -0,0 +1,33 @@
+import os
+import sys
+import json
+import subprocess
+
+# Measurement of parse_sol25 in new process - fresh interpreter has no cached trees or grown heap from previous
+# measurements, so time and peak memory belong to one parse only (used by large_program.py and stress_nesting.py)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Code run in child process, backend is created before measurement and memory is growth of peak RSS during the parse
+CHILD = """
+import sys, time, json, resource
+sys.path.insert(0, sys.argv[1])
+import parse
+source = sys.stdin.read()
+parse.get_backend()
+base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+result = parse.parse_sol25(source)
+elapsed = time.perf_counter() - start
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"time": elapsed, "memory_kb": peak - base, "xml": len(result.xml)}))
+"""
+
+# Returns {"time": seconds, "memory_kb": growth of peak RSS, "xml": length of XML} of parse of source in new process,
+# None when the child fails (the end of its stderr is written to stderr)
+def parse_in_child(source):
+    result = subprocess.run([sys.executable, "-c", CHILD, ROOT], input=source, capture_output=True, text=True)
+    if(result.returncode != 0):
+        sys.stderr.write(result.stderr[-2000:])
+        return None
+    return json.loads(result.stdout)
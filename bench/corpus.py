@@ -0,0 +1,86 @@
+import sys
+import random
+import argparse
+
+# Generator of synthetic SOL25 programs for benchmarks, generated programs are valid (parse.py returns 0)
+# Size of program is controlled by independent axes:
+#   classes  - number of classes (besides Main)
+#   methods  - methods of every class (unary and keyword selectors alternate)
+#   depth    - nesting of blocks inside every method
+#   chain    - length of chain of sends (receiver of every send is the previous send in parentheses)
+#   comments - number of comment lines before every method
+# Usage: python bench/corpus.py [--classes N] [--methods N] [--depth N] [--chain N] [--comments N] [--seed N] > program.sol
+
+# Selectors sent to receivers (names only, receivers are not checked by parse.py)
+UNARY = ["value", "asString", "isNil", "negated", "size"]
+KEYWORD = ["plus:", "minus:", "at:", "with:", "multiplyBy:"]
+
+# Returns sentence for comment (comments cannot contain quotation mark)
+def comment_text(rng):
+    words = ["parser", "class", "value", "block", "send", "method", "number", "text", "result", "loop"]
+    return " ".join(rng.choice(words) for _ in range(rng.randint(4, 10)))
+
+# Returns expression with chain of sends, every send takes the previous one as receiver
+def send_chain(rng, receiver, length):
+    expr = receiver
+    for i in range(length):
+        if(rng.random() < 0.3):
+            expr = f"({expr} {rng.choice(UNARY)})"
+        else:
+            expr = f"({expr} {rng.choice(KEYWORD)} {rng.randint(0, 999)})"
+    return expr
+
+# Returns lines of block body nested to depth, parameters of outer blocks stay visible in the inner ones
+def block_body(rng, depth, chain, indent):
+    pad = "    " * indent
+    lines = [f"{pad}v := {send_chain(rng, 'p', chain)}."]
+    if(depth > 0):
+        lines.append(f"{pad}b{depth} := [ :p |")
+        lines.extend(block_body(rng, depth - 1, chain, indent + 1))
+        lines.append(f"{pad}].")
+    return lines
+
+# Returns lines of one method, odd methods have keyword selector with two parameters
+def method_lines(rng, index, depth, chain, comments):
+    lines = [f'    "{comment_text(rng)}"' for _ in range(comments)]
+    if(index % 2 == 0):
+        lines.append(f"    m{index} [ |")
+        lines.append(f"        p := {rng.randint(0, 999)}.")
+    else:
+        lines.append(f"    m{index}:with: [ :p :q |")
+        lines.append(f"        r := q.")
+    # One string literal in every method (bench/pathological_literals.py puts many of them on one line)
+    lines.append(f"        s := 'method {index}'.")
+    lines.append(f"        t := self m0.")
+    lines.extend(block_body(rng, depth, chain, 2))
+    lines.append("    ]")
+    return lines
+
+def generate_program(classes = 10, methods = 10, depth = 2, chain = 3, comments = 1, seed = 0):
+    rng = random.Random(seed)
+    lines = [f'"synthetic program: {classes} classes, {methods} methods, depth {depth}, chain {chain}"']
+    for i in range(classes):
+        lines.append(f"class C{i} : Object {{")
+        for j in range(methods):
+            lines.extend(method_lines(rng, j, depth, chain, comments))
+        lines.append("}")
+    lines.append("class Main : Object {")
+    lines.append("    run [ |")
+    lines.append(f"        x := {send_chain(rng, '(Object new)', chain)}.")
+    lines.append("    ]")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+def main():
+    parser = argparse.ArgumentParser(description="Generates synthetic SOL25 program")
+    parser.add_argument("--classes", type=int, default=10)
+    parser.add_argument("--methods", type=int, default=10)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--chain", type=int, default=3)
+    parser.add_argument("--comments", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    sys.stdout.write(generate_program(args.classes, args.methods, args.depth, args.chain, args.comments, args.seed))
+
+if __name__ == "__main__":
+    main()
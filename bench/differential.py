@@ -0,0 +1,98 @@
+import os
+import re
+import sys
+import random
+import argparse
+from collections import Counter
+
+from corpus import generate_program
+
+# Differential test of parser backends - every input is parsed by lark LALR (reference) and by compared backend,
+# their exit codes and XML have to be the same
+# Inputs are programs from INPUTS/, synthetic programs of bench/corpus.py and their random mutations
+# (replaced, inserted and deleted tokens, removed whitespace), most of mutations end with lexical or syntax error
+# Usage: python bench/differential.py [--backend NAME] [--count N] [--seed N] [--save DIR]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import parse
+
+# Parts of source for mutations - whitespace, comments, strings, identifiers (with colon), numbers and characters
+PART_RE = re.compile(r"""\s+|"[^"]*"|'(?:[^'\\\n]|\\.)*'|[A-Za-z_][A-Za-z0-9_]*:?|-?\d+|:=|.""")
+# Inserted tokens (valid ones and the ones which break lexer)
+TOKENS = ["class", "Main", "Object", "Integer", "self", "super", "nil", "true", "x", "value:", "run", "new",
+          ":", ":=", ".", "|", "[", "]", "(", ")", "{", "}", "1", "-2", "'s'", "'a\\'b'", "'\\x'", '"c"', "'", '"', "=", "#", "X:"]
+
+def load_sources():
+    sources = []
+    for dirpath, _, filenames in os.walk(os.path.join(ROOT, "INPUTS")):
+        for filename in sorted(filenames):
+            with open(os.path.join(dirpath, filename), encoding="utf-8") as filein:
+                sources.append(filein.read())
+    for seed in range(4):
+        sources.append(generate_program(classes=2, methods=3, depth=2, chain=2, comments=1, seed=seed))
+    return sources
+
+# Returns source with a few random changes of its parts
+def mutate(rng, source):
+    parts = PART_RE.findall(source)
+    if(rng.random() < 0.3):
+        # Terminals written without whitespace are read by contextual lexer
+        parts = [part for part in parts if (not part.isspace()) or (rng.random() < 0.5)]
+    for _ in range(rng.randint(1, 3)):
+        if(len(parts) == 0):
+            break
+        i = rng.randrange(len(parts))
+        operation = rng.random()
+        if(operation < 0.4):
+            parts[i] = rng.choice(TOKENS)
+        elif(operation < 0.7):
+            parts.insert(i, rng.choice(["", " "]) + rng.choice(TOKENS) + rng.choice(["", " "]))
+        else:
+            del parts[i]
+    return "".join(parts)
+
+# Returns (exit code, XML) of one parse
+def run_backend(source, backend_name):
+    try:
+        return 0, parse.parse_sol25(source, backend_name).xml
+    except parse.ParseError as error:
+        return error.code, ""
+
+def main():
+    parser = argparse.ArgumentParser(description="Differential test of parser backends of parse.py")
+    parser.add_argument("--backend", default="descent", choices=parse.BACKENDS, help="backend compared with lark LALR")
+    parser.add_argument("--count", type=int, default=2000, help="number of mutated programs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", help="directory for inputs with different results")
+    args = parser.parse_args()
+    # Recursive backends get the same nesting as the reference
+    sys.setrecursionlimit(20000)
+
+    rng = random.Random(args.seed)
+    sources = load_sources()
+    inputs = sources + [mutate(rng, rng.choice(sources)) for _ in range(args.count)]
+
+    codes = Counter()
+    differ = []
+    for source in inputs:
+        expected = run_backend(source, parse.DEFAULT_BACKEND)
+        result = run_backend(source, args.backend)
+        codes[expected[0]] += 1
+        if(result != expected):
+            differ.append((source, expected[0], result[0]))
+
+    print(f"{len(inputs)} inputs, exit codes of {parse.DEFAULT_BACKEND}: "
+          + ", ".join(f"{code}: {count}" for code, count in sorted(codes.items())))
+    print(f"{args.backend}: {len(differ)} different results")
+    for i, (source, expected, code) in enumerate(differ):
+        print(f"    input {i}: exit code {code} (expected {expected}) {source[:60]!r}")
+        if(args.save is not None):
+            os.makedirs(args.save, exist_ok=True)
+            with open(os.path.join(args.save, f"differ_{i}.sol"), "w", encoding="utf-8") as fileout:
+                fileout.write(source)
+    if(differ):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
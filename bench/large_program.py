@@ -0,0 +1,36 @@
+import sys
+
+from child_parse import parse_in_child
+
+# Benchmark of one large synthetic program - time, throughput and peak memory of parse_sol25 (in new process)
+# Usage: python bench/large_program.py [number of classes] [methods per class]
+
+# Returns program with given number of classes, every method contains sends, nested block and literals
+def generate_program(classes, methods):
+    lines = ['"synthetic program"']
+    for i in range(classes):
+        lines.append(f"class C{i} : Object {{")
+        for j in range(methods):
+            lines.append(f"    m{j}:with: [ :a :b |")
+            lines.append(f"        x := a plus: b.")
+            lines.append(f"        y := (x multiplyBy: {j}) foo: [ :q | r := q. ] bar: 'text {j}'.")
+            lines.append(f"        z := self m{j}: x with: (y asString).")
+            lines.append(f"    ]")
+        lines.append("}")
+    lines.append("class Main : Object { run [ | x := 1. ] }")
+    return "\n".join(lines) + "\n"
+
+def main():
+    classes = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    methods = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    source = generate_program(classes, methods)
+    measured = parse_in_child(source)
+    if(measured is None):
+        sys.exit(1)
+    size_kb = len(source.encode("utf-8")) / 1024
+    print(f"classes {classes}, methods per class {methods}, source {size_kb:.0f} KB, XML {measured['xml'] / 1024:.0f} KB")
+    print(f"time {measured['time']:.2f} s, throughput {size_kb / measured['time']:.0f} KB/s, peak memory +{measured['memory_kb'] / 1024:.1f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import os
+import sys
+import time
+import filecmp
+import tempfile
+import subprocess
+
+from corpus import generate_program
+
+# Benchmark of output cache (option --cache) in batch mode - build of mostly unchanged sources is simulated by
+# batch run with empty cache (cold), the same run again (warm) and run after change of a few files
+# Outputs of every run are compared with batch run without cache, the last run uses small limit of cache
+# and more processes to check that concurrent writes and eviction keep outputs correct and the size bounded
+# Usage: python bench/output_cache.py [number of files] [classes per file]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PARSE = os.path.join(ROOT, "parse.py")
+# Part of files changed before the last run
+CHANGED_PART = 0.1
+
+# Writes source files, every tenth one ends with syntax error (errors are cached too)
+def write_sources(in_dir, count, classes, seed = 0):
+    for i in range(count):
+        source = generate_program(classes=classes, methods=5, depth=2, chain=3, comments=1, seed=seed + i)
+        if(i % 10 == 9):
+            source += "class"
+        with open(os.path.join(in_dir, f"file{i:04d}.sol"), "w") as fileout:
+            fileout.write(source)
+
+# Runs batch mode, returns elapsed wall time
+def run_batch(in_dir, out_dir, args = ()):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, PARSE, "--batch", in_dir, "--out", out_dir, *args], stderr=subprocess.PIPE, text=True)
+    elapsed = time.perf_counter() - start
+    if(result.returncode != 0):
+        sys.exit(f"parse.py --batch failed with exit code {result.returncode}: {result.stderr}")
+    return elapsed
+
+# Checks that out_dir contains the same files as ref_dir
+def check_same(ref_dir, out_dir, label):
+    names = sorted(os.listdir(ref_dir))
+    if(sorted(os.listdir(out_dir)) != names):
+        sys.exit(f"{label}: different output files")
+    _, mismatch, errors = filecmp.cmpfiles(ref_dir, out_dir, names, shallow=False)
+    if(mismatch or errors):
+        sys.exit(f"{label}: different outputs {mismatch + errors}")
+
+def get_dir_size(path):
+    return sum(entry.stat().st_size for entry in os.scandir(path))
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    classes = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    with tempfile.TemporaryDirectory(prefix="sol25_cache_") as work_dir:
+        in_dir = os.path.join(work_dir, "in")
+        cache_dir = os.path.join(work_dir, "cache")
+        os.makedirs(in_dir)
+        write_sources(in_dir, count, classes)
+        size = sum(os.path.getsize(os.path.join(in_dir, name)) for name in os.listdir(in_dir))
+        print(f"{count} files, {size / 1024:.0f} KB")
+
+        times = {}
+        times["no cache"] = run_batch(in_dir, os.path.join(work_dir, "ref"))
+        times["cold"] = run_batch(in_dir, os.path.join(work_dir, "cold"), ("--cache", cache_dir))
+        times["warm"] = run_batch(in_dir, os.path.join(work_dir, "warm"), ("--cache", cache_dir))
+        check_same(os.path.join(work_dir, "ref"), os.path.join(work_dir, "cold"), "cold")
+        check_same(os.path.join(work_dir, "ref"), os.path.join(work_dir, "warm"), "warm")
+
+        # A few changed files have to be parsed again, their old results are not used
+        changed = int(count * CHANGED_PART)
+        for i in range(changed):
+            source = generate_program(classes=classes, methods=5, depth=2, chain=3, comments=1, seed=count + i)
+            with open(os.path.join(in_dir, f"file{i:04d}.sol"), "w") as fileout:
+                fileout.write(source)
+        times[f"{changed} changed"] = run_batch(in_dir, os.path.join(work_dir, "changed"), ("--cache", cache_dir))
+        run_batch(in_dir, os.path.join(work_dir, "ref2"))
+        check_same(os.path.join(work_dir, "ref2"), os.path.join(work_dir, "changed"), "changed")
+
+        for label, elapsed in times.items():
+            print(f"{label:<14}{elapsed * 1000:>10.0f} ms")
+
+        # Cache of 1 MB shared by 8 processes is filled over and over
+        small_dir = os.path.join(work_dir, "small")
+        for run in range(3):
+            run_batch(in_dir, os.path.join(work_dir, "small_out"), ("--cache", small_dir, "--cache-size", "1", "--jobs", "8"))
+            check_same(os.path.join(work_dir, "ref2"), os.path.join(work_dir, "small_out"), f"small cache run {run}")
+        print(f"cache limited to 1024 KB: {get_dir_size(small_dir) / 1024:.0f} KB after 3 runs, outputs correct")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import io
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+
+from corpus import generate_program
+
+# Comparison of output formats (option --format) - size of output of synthetic programs and time of its load
+# by consumer (interpreter): ElementTree tree of XML and AST built by loaders of parse.py from every format
+# Every loaded AST is written again as XML, it has to be the same as the original output (exit code 1 otherwise)
+# Usage: python bench/output_formats.py [classes]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import parse
+
+FORMATS = ("xml", "jsonl", "bin")
+
+# Returns output of source in format
+def translate(source, output_format):
+    out = io.BytesIO() if parse.WRITERS[output_format].isBinary else io.StringIO()
+    parse.write_sol25(source, out, output_format=output_format)
+    return out.getvalue()
+
+# Writes classes loaded from output as XML
+def write_xml(description, classes):
+    out = io.StringIO()
+    writer = parse.XML_Writer(out, parse.get_program_attrib(description))
+    for class_def in classes:
+        writer.write_class(class_def)
+    writer.end()
+    return out.getvalue()
+
+# Returns the best elapsed time of runs of load(data)
+def measure(load, data, runs = 3):
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        load(data)
+        elapsed = time.perf_counter() - start
+        if((best is None) or (elapsed < best)):
+            best = elapsed
+    return best
+
+def main():
+    max_classes = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    isOk = True
+    print(f"{'classes':>8}{'format':>8}{'size [KB]':>12}{'ratio':>8}{'load':>14}{'load [ms]':>12}")
+    for classes in (max_classes // 4, max_classes):
+        source = generate_program(classes=classes, methods=10, depth=2, chain=3, comments=1)
+        outputs = {output_format: translate(source, output_format) for output_format in FORMATS}
+        xml = outputs["xml"]
+        xml_size = len(xml.encode("utf-8"))
+        print(f"{classes:>8}{'xml':>8}{xml_size / 1024:>12.0f}{1:>8.2f}{'ElementTree':>14}{measure(ET.fromstring, xml) * 1000:>12.1f}")
+        for output_format in FORMATS:
+            data = outputs[output_format]
+            size = len(data) if isinstance(data, bytes) else len(data.encode("utf-8"))
+            load = parse.LOADERS[output_format]
+            elapsed = measure(load, data)
+            print(f"{'':>8}{output_format:>8}{size / 1024:>12.0f}{size / xml_size:>8.2f}{'AST':>14}{elapsed * 1000:>12.1f}")
+            if(write_xml(*load(data)) != xml):
+                print(f"{output_format}: loaded AST differs from the translated program")
+                isOk = False
+    sys.exit(0 if isOk else 1)
+
+if __name__ == "__main__":
+    main()
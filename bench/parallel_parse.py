@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+import tempfile
+import subprocess
+
+from corpus import generate_program
+
+# Benchmark of parallel parse of one program (option --jobs without --batch) - big synthetic program is translated
+# by parse.py in one process and by pools of growing size, output and exit code have to be the same as serial ones
+# The same is checked for the program with semantic error in one of the last classes
+# Usage: python bench/parallel_parse.py [classes] [maximal number of processes]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PARSE = os.path.join(ROOT, "parse.py")
+
+# Runs parse.py, returns (elapsed wall time, exit code, output)
+def run_parse(input_path, args = ()):
+    with open(input_path, "rb") as filein:
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, PARSE, *args], stdin=filein, capture_output=True)
+        elapsed = time.perf_counter() - start
+    return elapsed, result.returncode, result.stdout
+
+def main():
+    classes = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    max_jobs = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    source = generate_program(classes=classes, methods=10, depth=2, chain=3, comments=1)
+    # Class literal of undefined class in the last class (Main), error 32
+    broken = source.replace("(Object new)", "(Undefined new)")
+    print(f"{classes} classes, {len(source) / 1024 / 1024:.1f} MB, {os.cpu_count()} CPUs")
+
+    with tempfile.TemporaryDirectory(prefix="sol25_parallel_") as work_dir:
+        for label, text in (("correct", source), ("error", broken)):
+            input_path = os.path.join(work_dir, f"{label}.sol")
+            with open(input_path, "w") as fileout:
+                fileout.write(text)
+            serial, expected_code, expected = run_parse(input_path)
+            print(f"{label} (exit code {expected_code})")
+            print(f"{'jobs':>6}{'time [ms]':>12}{'speedup':>10}")
+            print(f"{1:>6}{serial * 1000:>12.0f}{1:>10.2f}")
+            jobs = 2
+            while jobs <= max(max_jobs, 2):
+                elapsed, code, output = run_parse(input_path, ("--jobs", str(jobs)))
+                if((code != expected_code) or (output != expected)):
+                    sys.exit(f"--jobs {jobs}: exit code {code}, output differs from serial parse")
+                print(f"{jobs:>6}{elapsed * 1000:>12.0f}{serial / elapsed:>10.2f}")
+                jobs *= 2
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import gc
+import os
+import sys
+import time
+import statistics
+
+# Stress test of lexing of string literals and comments - megabyte long lines with one literal or thousands of them,
+# unterminated literals and huge comments full of apostrophes and newlines
+# Every input is parsed by backends with their own lexer in three sizes, test fails (exit code 1) when the result
+# is not the expected exit code or when time grows faster than linearly with size
+# Usage: python bench/pathological_literals.py [maximal size in KB]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import parse
+
+BACKENDS = ("lark-lalr", "descent")
+
+def program(statements):
+    return f"class Main : Object {{ run [ | {statements} ] }}"
+
+# One literal on one line, with escape sequences
+def long_literal(size):
+    return program("x := '" + "it\\'s \\\\ line\\n " * (size // 16) + "'.")
+
+# Thousands of literals on one line
+def many_literals(size):
+    return program("x := 'a\\'b' . y := '' . " * (size // 24))
+
+# Literals as arguments of one keyword send
+def literal_arguments(size):
+    return program("x := 'a' " + "with: 'b c' " * (size // 12) + ".")
+
+# Literal without closing apostrophe, the rest of long line is full of escaped apostrophes (lexical error)
+def unterminated_literal(size):
+    return program("x := 'a' . y := 'b" + "\\' c " * (size // 6))
+
+# Comment with apostrophes and newlines before the program
+def huge_comment(size):
+    return '"' + "it's a 'comment' \n" * (size // 18) + '"\n' + program("x := 'a'.")
+
+# Comment without closing quotation mark (lexical error)
+def unterminated_comment(size):
+    return program("x := 'a'.") + ' "' + "'a' . " * (size // 6)
+
+# Name -> (generator, expected exit code)
+INPUTS = {
+    "long literal": (long_literal, 0),
+    "many literals": (many_literals, 0),
+    "arguments": (literal_arguments, 0),
+    "unterminated": (unterminated_literal, parse.Error.LEXERR.value),
+    "comment": (huge_comment, 0),
+    "open comment": (unterminated_comment, parse.Error.LEXERR.value),
+}
+
+# Returns exit code of parse
+def run(source, backend_name):
+    try:
+        parse.parse_sol25(source, backend_name)
+        return 0
+    except parse.ParseError as error:
+        return error.code
+
+# Returns (exit code, median elapsed time of runs) of parse - the first run only warms up caches and allocator,
+# garbage collector is off while timing (its passes over big trees would be measured as parse time)
+def measure(source, backend_name, runs = 5):
+    code = run(source, backend_name)
+    times = []
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(runs):
+            start = time.perf_counter()
+            run(source, backend_name)
+            times.append(time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return code, statistics.median(times)
+
+def main():
+    max_size = int(sys.argv[1]) * 1024 if len(sys.argv) > 1 else 1024 * 1024
+    sizes = [max_size // 4, max_size // 2, max_size]
+    isOk = True
+    for backend_name in BACKENDS:
+        parse.get_backend(backend_name)
+    print(f"{'input':<15}{'backend':<11}" + "".join(f"{size // 1024:>9} KB" for size in sizes))
+    for name, (generator, expected) in INPUTS.items():
+        for backend_name in BACKENDS:
+            times = []
+            for size in sizes:
+                code, elapsed = measure(generator(size), backend_name)
+                if(code != expected):
+                    print(f"{name}: exit code {code} of {backend_name} (expected {expected})")
+                    isOk = False
+                times.append(elapsed)
+            print(f"{name:<15}{backend_name:<11}" + "".join(f"{elapsed * 1000:>9.1f} ms" for elapsed in times))
+            # Quadrupled size may cost at most 10 times more - linear growth is x4 (up to x6 when input stops fitting
+            # into CPU caches), quadratic one is x16
+            growth = times[-1] / max(times[0], 1e-3)
+            if(growth > 10):
+                print(f"{name}: growth is not linear (time x{growth:.1f})")
+                isOk = False
+    sys.exit(0 if isOk else 1)
+
+if __name__ == "__main__":
+    main()
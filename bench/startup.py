@@ -0,0 +1,64 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import subprocess
+
+# Startup benchmark - compares process time of parse.py with empty (cold) and filled (warm) grammar cache
+# and with standalone parser generated by tools/build_standalone.py (if it exists)
+# Usage: python bench/startup.py [input file] [number of runs]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PARSE = os.path.join(ROOT, "parse.py")
+
+# Runs parse.py once and returns elapsed wall time in seconds
+def run_once(input_path, cache_dir, use_standalone=False):
+    env = dict(os.environ, SOL25_CACHE_DIR=cache_dir, SOL25_STANDALONE="1" if use_standalone else "0")
+    with open(input_path, "rb") as filein:
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, PARSE], stdin=filein, stdout=subprocess.DEVNULL, env=env)
+        elapsed = time.perf_counter() - start
+    if(result.returncode != 0):
+        sys.exit(f"parse.py failed with exit code {result.returncode}")
+    return elapsed
+
+# Returns (min, median) of measured times in milliseconds
+def summary(times):
+    times = sorted(times)
+    return times[0] * 1000, times[len(times) // 2] * 1000
+
+def main():
+    input_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(ROOT, "INPUTS", "1_sample.SOL25")
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    cache_dir = tempfile.mkdtemp(prefix="sol25_bench_")
+    try:
+        cold = []
+        for _ in range(runs):
+            # Removing the cache before every run forces the grammar analysis
+            shutil.rmtree(cache_dir)
+            os.mkdir(cache_dir)
+            cold.append(run_once(input_path, cache_dir))
+        warm = []
+        run_once(input_path, cache_dir)
+        for _ in range(runs):
+            warm.append(run_once(input_path, cache_dir))
+        disabled = [run_once(input_path, "") for _ in range(runs)]
+        standalone = []
+        if(os.path.exists(os.path.join(ROOT, "sol25_parser.py"))):
+            run_once(input_path, "", True)
+            standalone = [run_once(input_path, "", True) for _ in range(runs)]
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    print(f"input: {os.path.relpath(input_path, ROOT)}, runs: {runs}")
+    print(f"{'mode':<12}{'min [ms]':>12}{'median [ms]':>14}")
+    for name, times in (("no cache", disabled), ("cold", cold), ("warm", warm), ("standalone", standalone)):
+        if(len(times) == 0):
+            continue
+        fastest, median = summary(times)
+        print(f"{name:<12}{fastest:>12.1f}{median:>14.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import sys
+
+from child_parse import parse_in_child
+
+# Stress test of deeply nested programs - parenthesised expressions and blocks nested to given depth
+# Every depth is parsed in new process, test fails (exit code 1) when the parse fails
+# or when time or memory grows faster than linearly with depth
+# Usage: python bench/stress_nesting.py [maximal depth]
+
+# Returns program with expression nested in parentheses
+def nested_parentheses(depth):
+    return f"class Main : Object {{ run [ | x := {'(' * depth}1{')' * depth}. ] }}"
+
+# Returns program with blocks nested in assignments
+def nested_blocks(depth):
+    return f"class Main : Object {{ run [ | {'x := [ | ' * depth}{'] .' * depth} ] }}"
+
+# Returns program with chain of keyword sends nested as arguments
+def nested_sends(depth):
+    return f"class Main : Object {{ run [ | x := {'1 plus: (' * depth}1{')' * depth}. ] }}"
+
+def main():
+    max_depth = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    depths = [max_depth // 4, max_depth // 2, max_depth]
+    isOk = True
+    print(f"{'program':<14}{'depth':>8}{'time [ms]':>12}{'memory [MB]':>14}")
+    for name, generator in (("parentheses", nested_parentheses), ("blocks", nested_blocks), ("sends", nested_sends)):
+        results = []
+        for depth in depths:
+            measured = parse_in_child(generator(depth))
+            if(measured is None):
+                print(f"{name:<14}{depth:>8}  FAILED")
+                isOk = False
+                break
+            results.append(measured)
+            print(f"{name:<14}{depth:>8}{measured['time'] * 1000:>12.1f}{measured['memory_kb'] / 1024:>14.1f}")
+        if(len(results) != len(depths)):
+            continue
+        # Quadrupled depth may cost at most 6 times more (linear growth with a margin for noise),
+        # peak memory below 4 MB is not compared because RSS grows by whole arenas of allocator
+        time_ratio = results[-1]["time"] / max(results[0]["time"], 1e-6)
+        memory_ratio = results[-1]["memory_kb"] / max(results[0]["memory_kb"], 4096)
+        if((time_ratio > 6) or (memory_ratio > 6)):
+            print(f"{name}: growth is not linear (time x{time_ratio:.1f}, memory x{memory_ratio:.1f})")
+            isOk = False
+    sys.exit(0 if isOk else 1)
+
+if __name__ == "__main__":
+    main()
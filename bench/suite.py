@@ -0,0 +1,150 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import subprocess
+
+from corpus import generate_program
+
+# Benchmark suite - every scenario is synthetic program (bench/corpus.py) which grows along one axis
+# parse.py is timed end to end (new process for every run) and once more with --stats=json for times of phases
+# Report is saved as JSON, the report of another version can be compared with it (regression ends with exit code 1)
+# Usage: python bench/suite.py [--runs N] [--quick] [--out report.json] [--compare old_report.json] [--threshold 0.2]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PARSE = os.path.join(ROOT, "parse.py")
+
+# Name -> parameters of generate_program (the first one is baseline for the other ones)
+SCENARIOS = {
+    "baseline": {"classes": 20, "methods": 10, "depth": 2, "chain": 3, "comments": 1},
+    "classes": {"classes": 200, "methods": 10, "depth": 2, "chain": 3, "comments": 1},
+    "methods": {"classes": 5, "methods": 400, "depth": 2, "chain": 3, "comments": 1},
+    "nesting": {"classes": 5, "methods": 10, "depth": 60, "chain": 3, "comments": 1},
+    "chains": {"classes": 5, "methods": 10, "depth": 2, "chain": 80, "comments": 1},
+    "comments": {"classes": 20, "methods": 10, "depth": 2, "chain": 3, "comments": 40},
+}
+# Sizes are divided by this number with --quick (smoke test of the suite)
+QUICK_DIVISOR = 10
+
+# Runs parse.py with input file, returns (elapsed wall time, exit code)
+def run_parse(input_path, args=()):
+    with open(input_path, "rb") as filein:
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, PARSE, *args], stdin=filein, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        elapsed = time.perf_counter() - start
+    return elapsed, result.returncode
+
+# Returns phases and counters reported by parse.py --stats=json
+def run_stats(input_path, stats_path):
+    elapsed, code = run_parse(input_path, ("--stats=json", f"--stats-file={stats_path}"))
+    if(code != 0):
+        sys.exit(f"parse.py --stats failed with exit code {code}")
+    with open(stats_path) as filein:
+        return json.load(filein)
+
+def measure_scenario(params, runs, work_dir):
+    input_path = os.path.join(work_dir, "program.sol")
+    source = generate_program(**params)
+    with open(input_path, "w") as fileout:
+        fileout.write(source)
+
+    times = []
+    for _ in range(runs):
+        elapsed, code = run_parse(input_path)
+        if(code != 0):
+            sys.exit(f"parse.py failed with exit code {code} for {params}")
+        times.append(elapsed)
+    times.sort()
+    stats = run_stats(input_path, os.path.join(work_dir, "stats.json"))
+
+    size = len(source.encode("utf-8"))
+    return {
+        "params": params,
+        "source_bytes": size,
+        "e2e": {"min": times[0], "median": times[len(times) // 2]},
+        "throughput_kb_s": size / 1024 / times[len(times) // 2],
+        "phases": {name: phase["wall"] for name, phase in stats["phases"].items()},
+        "counters": stats["counters"],
+        "peak_memory_kb": stats["peak_memory_kb"],
+    }
+
+# Description of measured version (reports of different machines or parsers should not be compared)
+def get_meta(runs, quick):
+    probe = subprocess.run([sys.executable, "-c", "import parse; print(parse.lark_version, parse.standalone is not None)"],
+                           cwd=ROOT, capture_output=True, text=True)
+    lark_version, standalone = probe.stdout.split() if probe.returncode == 0 else ("?", "?")
+    commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit.stdout.strip() if commit.returncode == 0 else None,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "lark": lark_version,
+        "standalone": standalone == "True",
+        "runs": runs,
+        "quick": quick,
+    }
+
+def print_report(report):
+    print(f"{'scenario':<10}{'size [KB]':>11}{'median [ms]':>13}{'KB/s':>9}{'lex':>9}{'parse':>9}{'check+write':>13}{'memory [MB]':>13}")
+    for name, result in report["scenarios"].items():
+        phases = result["phases"]
+        print(f"{name:<10}{result['source_bytes'] / 1024:>11.1f}{result['e2e']['median'] * 1000:>13.1f}"
+              f"{result['throughput_kb_s']:>9.0f}{phases.get('lex', 0) * 1000:>9.1f}{phases.get('parse', 0) * 1000:>9.1f}"
+              f"{phases.get('check+write', 0) * 1000:>13.1f}{result['peak_memory_kb'] / 1024:>13.1f}")
+
+# Prints ratios of medians (new / old), returns False when any scenario is slower than threshold allows
+def compare_reports(old, new, threshold):
+    isOk = True
+    print(f"\ncompared with {old['meta'].get('commit')} ({old['meta'].get('created')})")
+    print(f"{'scenario':<10}{'old [ms]':>11}{'new [ms]':>11}{'ratio':>8}")
+    for name, result in new["scenarios"].items():
+        if(name not in old["scenarios"]):
+            continue
+        if(old["scenarios"][name]["params"] != result["params"]):
+            print(f"{name:<10}  parameters differ, not compared")
+            continue
+        old_median = old["scenarios"][name]["e2e"]["median"]
+        new_median = result["e2e"]["median"]
+        ratio = new_median / old_median
+        mark = ""
+        if(ratio > 1 + threshold):
+            mark = "  REGRESSION"
+            isOk = False
+        print(f"{name:<10}{old_median * 1000:>11.1f}{new_median * 1000:>11.1f}{ratio:>8.2f}{mark}")
+    return isOk
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite of parse.py")
+    parser.add_argument("--runs", type=int, default=5, help="runs of every scenario (median is reported)")
+    parser.add_argument("--quick", action="store_true", help="smaller programs")
+    parser.add_argument("--out", help="file for JSON report")
+    parser.add_argument("--compare", help="JSON report of older version")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown against --compare")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, help="run only given scenarios")
+    args = parser.parse_args()
+
+    report = {"meta": get_meta(args.runs, args.quick), "scenarios": {}}
+    with tempfile.TemporaryDirectory(prefix="sol25_suite_") as work_dir:
+        for name, params in SCENARIOS.items():
+            if((args.scenario is not None) and (name not in args.scenario)):
+                continue
+            if(args.quick):
+                params = {axis: max(1, value // QUICK_DIVISOR) for axis, value in params.items()}
+            report["scenarios"][name] = measure_scenario(params, args.runs, work_dir)
+    print_report(report)
+
+    if(args.out is not None):
+        with open(args.out, "w") as fileout:
+            json.dump(report, fileout, indent=2)
+    if(args.compare is not None):
+        with open(args.compare) as filein:
+            old = json.load(filein)
+        if(not compare_reports(old, report, args.threshold)):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import os
+import io
+import sys
+import time
+
+from corpus import generate_program
+
+# Benchmark of watch mode (option --watch) - large program is translated after small edits by full parse
+# (write_sol25) and by Incremental_Translator, which parses again only the changed classes
+# Edits change one character of a method, break a class with syntax error, fix it and change parent of a class,
+# output (XML or exit code) of every version is compared with the full parse
+# Usage: python bench/watch_incremental.py [classes] [methods per class]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import parse
+
+# Returns (exit code, XML, elapsed time) of one translation
+def run_translation(translate, source):
+    out = io.StringIO()
+    start = time.perf_counter()
+    try:
+        translate(source, out)
+        code = 0
+    except parse.ParseError as error:
+        code = error.code
+    elapsed = time.perf_counter() - start
+    return code, out.getvalue() if code == 0 else "", elapsed
+
+# Returns list of (label, source) - versions of the program after edits
+def get_versions(source):
+    middle = source.index("class C", len(source) // 2)
+    first_int = source.index("1", middle)
+    versions = [("original", source)]
+    versions.append(("one character", source[:first_int] + "7" + source[first_int + 1:]))
+    broken = versions[-1][1][:middle] + "class" + versions[-1][1][middle:]
+    versions.append(("syntax error", broken))
+    versions.append(("error fixed", versions[-2][1]))
+    versions.append(("parent changed", versions[-1][1].replace("class C1 : Object", "class C1 : C0", 1)))
+    versions.append(("no change", versions[-1][1]))
+    return versions
+
+def main():
+    classes = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    methods = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    source = generate_program(classes=classes, methods=methods, depth=2, chain=3, comments=1)
+    print(f"{classes} classes, {source.count(chr(10)) + 1} lines, {len(source) / 1024:.0f} KB")
+
+    translator = parse.Incremental_Translator()
+    print(f"{'version':<16}{'code':>5}{'full [ms]':>11}{'incremental [ms]':>18}{'parsed':>8}{'checked':>9}")
+    for label, version in get_versions(source):
+        expected = run_translation(lambda text, out: parse.write_sol25(text, out), version)
+        result = run_translation(translator.translate, version)
+        if(result[:2] != expected[:2]):
+            sys.exit(f"{label}: incremental translation differs from full parse")
+        print(f"{label:<16}{expected[0]:>5}{expected[2] * 1000:>11.1f}{result[2] * 1000:>18.1f}"
+              f"{translator.parsed:>8}{translator.checked:>5}/{translator.classes}")
+
+if __name__ == "__main__":
+    main()
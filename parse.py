@@ -1,9 +1,21 @@
+import io
+import os
+import re
 import sys
-import xml.etree.ElementTree as ET
+import json
+import time
+import resource
+import shutil
+import hashlib
+import tempfile
+import array
+import struct
+import threading
 
 from enum import Enum
-from lark import Lark, UnexpectedCharacters, UnexpectedToken, Transformer, Visitor
-from collections import defaultdict
+from stat import S_ISREG
+from types import MappingProxyType
+from contextlib import contextmanager, nullcontext
 
 # If debug set it to True
 isdebug = False 
@@ -11,7 +23,22 @@ isdebug = False
 input_file = ""
 
 KEYWORDS = {"super", "nil", "class", "self", "true", "false", "main", "Main"}
-CLASS_ID = {"Object", "Nil", "True", "False", "Integer", "String", "Block"}
+BUILTIN_CLASS_ID = frozenset({"Object", "Nil", "True", "False", "Integer", "String", "Block"})
+# Suffixes of source files searched in batch mode
+SOURCE_SUFFIXES = (".sol25", ".sol")
+# Server mode - default socket (same as in parse_client.py) and maximal number of waiting requests
+DEFAULT_SOCKET = os.environ.get("SOL25_SOCKET", os.path.join(tempfile.gettempdir(), f"sol25-{os.getuid()}.sock"))
+SERVE_QUEUE_SIZE = 64
+# Maximal size of XML kept in memory before it is printed (bigger output goes through temporary file)
+SPOOL_SIZE = 1 << 20
+# Output cache (option --cache) - default limit of its size in MB, the least recently used entries are removed
+# down to CACHE_LOW_WATER of the limit, size of directory is checked again after CACHE_SCAN_INTERVAL writes
+# of one process (the other processes sharing the directory are not counted in between)
+OUTPUT_CACHE_SIZE = 64
+CACHE_LOW_WATER = 0.9
+CACHE_SCAN_INTERVAL = 64
+# Temporary files older than this (seconds) were left by killed process and they are removed
+CACHE_TMP_AGE = 3600
 
 # Lark grammars
 grammar = """
@@ -30,7 +57,10 @@ grammar = """
     block_stat: (id ":=" expr ".")*
 
     expr: expr_base expr_tail
-    expr_base: id | cid | str_def | int_def | "(" expr ")" | block
+    expr_base: id -> expr_var
+             | cid -> expr_class
+             | str_def | int_def | block
+             | "(" expr ")" -> expr_paren
     expr_tail: id | (id_dot expr_base)*
 
     cid: /[A-Z][a-zA-Z0-9_]*/ 
@@ -38,22 +68,41 @@ grammar = """
     id_dot:/[a-zA-Z_][a-zA-Z0-9_]*:/
 
     int_def : /-?\d+([eE][+-]?\d+)?/
-    str_def : /\'(?:.)*\'/
-    COMMENT: /\"(?:\\.|[^\\"])*\"/s
+    str_def : /\'[^\'\\\\\\n]*(?:\\\\[\'n\\\\][^\'\\\\\\n]*)*\'/
+    COMMENT: /\"[^\"]*\"/
 
     %import common.WS
     %ignore COMMENT
     %ignore WS
 """
-grammar_comment = """ 
-    start: comment*
 
-    comment: /"([^"\\\\]|\\\\.)*"/  // Match text inside double quotes
+# Version of generated standalone module (it is increased when tools/build_standalone.py changes its content)
+STANDALONE_FORMAT = 3
+# Returns hash of grammar, generated standalone parser is used only when it was built from the same grammar
+def get_grammar_digest():
+    return hashlib.sha256(f"{grammar}{STANDALONE_FORMAT}".encode("utf-8")).hexdigest()
+# Loads standalone parser generated by tools/build_standalone.py (make standalone), None if it is missing or outdated
+def load_standalone():
+    if(os.environ.get("SOL25_STANDALONE", "1") == "0"):
+        return None
+    try:
+        import sol25_parser
+    except ImportError:
+        return None
+    if(getattr(sol25_parser, "GRAMMAR_DIGEST", None) != get_grammar_digest()):
+        return None
+    return sol25_parser
 
-    %ignore /[^"]+/  // Ignore everything except double quotes
-    %ignore " "  // Ignore spaces
-    %ignore "\\n"  // Ignore newlines
-"""
+# Standalone parser contains its own copy of Lark runtime, so import of lark and grammar analysis are skipped
+standalone = load_standalone()
+if(standalone is not None):
+    from sol25_parser import Lark, UnexpectedCharacters, UnexpectedToken, Transformer_NonRecursive, __version__ as lark_version
+else:
+    from lark import Lark, UnexpectedCharacters, UnexpectedToken, Transformer_NonRecursive, __version__ as lark_version
+
+# Directory for cached LALR tables (environment variable SOL25_CACHE_DIR, empty value disables the cache)
+# Tables are pickled, so the default directory is private directory of user (not shared temporary directory)
+cache_dir = os.environ.get("SOL25_CACHE_DIR", os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "sol25"))
 
 # Basic enum where error values are stored
 class Error(Enum):
@@ -79,156 +128,342 @@ class Debug:
         return data
 
 # Classes to associate methods with their inheritance (semantic analysis)
+# Tables are created only once at import time and they are shared (immutable) by all parses
 class OBJECT:
-    def __init__(self):
-        self.methods = {"identicalTo:", "equalTo:", "asString", "isNumber", "isString", "isBlock", "isNil", "new", "from"}
+    methods = frozenset({"identicalTo:", "equalTo:", "asString", "isNumber", "isString", "isBlock", "isNil", "new", "from"})
     
     def contain(self, value):
         return value in self.methods
 class NIL(OBJECT):
-    def __init__(self):
-        super().__init__()
+    methods = OBJECT.methods
 class INTEGER(OBJECT):
-    def __init__(self):
-        super().__init__()
-        self.methods.add("greaterThan:")
-        self.methods.add("plus:")
-        self.methods.add("minus:")
-        self.methods.add("multiplyBy:")
-        self.methods.add("divBy:")
-        self.methods.add("asInteger")
-        self.methods.add("timesRepeat:")
+    methods = OBJECT.methods | {"greaterThan:", "plus:", "minus:", "multiplyBy:", "divBy:", "asInteger", "timesRepeat:"}
 class STRING(OBJECT):
-    def __init__(self):
-        super().__init__()
-        self.methods.add("read")
-        self.methods.add("print")
-        self.methods.add("asInteger")
-        self.methods.add("concatenateWith:")
-        self.methods.add("startsWith:endsBefore:")
+    methods = OBJECT.methods | {"read", "print", "asInteger", "concatenateWith:", "startsWith:endsBefore:"}
 class BLOCK(OBJECT):
-    def __init__(self):
-        super().__init__()
-        self.methods.add("whileTrue:")
+    methods = OBJECT.methods | {"whileTrue:"}
 class FALSE_TRUE(OBJECT):
+    methods = OBJECT.methods | {"not", "and:", "or:", "ifTrue:ifFalse:"}
+
+# Builtin class -> (parent, all its selectors)
+BUILTIN_CLASSES = MappingProxyType({
+    "Object": (None, OBJECT.methods),
+    "Nil": ("Object", NIL.methods),
+    "Integer": ("Object", INTEGER.methods),
+    "String": ("Object", STRING.methods),
+    "Block": ("Object", BLOCK.methods),
+    "True": ("Object", FALSE_TRUE.methods),
+    "False": ("Object", FALSE_TRUE.methods),
+})
+
+# Index of class hierarchy - parent of every class, own selectors and all selectors including inherited ones
+# Registration of class costs O(own methods), lookup of selector is O(1) (closure is computed once for every class)
+class Class_Hierarchy:
     def __init__(self):
-        super().__init__()
-        self.methods.add("not")
-        self.methods.add("and:")
-        self.methods.add("or:")
-        self.methods.add("ifTrue:ifFalse:")
-
-# Global variables for semantic analysis (values are saved during first transition and after that it checks)
-methodsInClass = defaultdict(list)
-numOfParams = defaultdict(list)
-InheritanceRelations = defaultdict(list)
-
-# Own Exceptions 
-class SemanticException(Exception):
-    def __init__(self, message):
-        super().__init__(message)
-class SyntacticException(Exception):
-    def __init__(self, message):
-        super().__init__(message)
-
-# Class dedicated for creation XML tree from AST generated by lark
-class Transform_XML(Transformer):
-    
-    def __init__(self, description = ""):
-        if(len(description) > 2):
-            self.description = description[1:-1]
-        else:
-            self.description = description
+        self.parents = {}
+        self.selectors = {}
+        # Class whose selectors are inherited, parent is linked only when it was registered before the class
+        self.inherits_from = {}
+        self.closures = {}
+
+    def add_class(self, name, parent, selectors):
+        self.parents[name] = parent
+        self.selectors[name] = selectors
+        if(((parent in self.selectors) or (parent in BUILTIN_CLASSES)) and (parent != name)):
+            self.inherits_from[name] = parent
+
+    # Builtin classes are registered with their shared tables (these are already complete closures)
+    def add_builtin_classes(self):
+        for name, (parent, methods) in BUILTIN_CLASSES.items():
+            self.parents[name] = parent
+            self.selectors[name] = methods
+            self.closures[name] = methods
+
+    # True if user class was registered with parent which is not builtin class
+    def has_user_parent(self, name):
+        return (name not in BUILTIN_CLASSES) and (name in self.parents) and (self.parents[name] not in BUILTIN_CLASSES)
+
+    def has_selector(self, name, selector):
+        closure = self.closures.get(name)
+        if(closure is None):
+            if(name not in self.selectors):
+                return False
+            closure = self.get_closure(name)
+        return selector in closure
+
+    # Returns all selectors of class, closures of its ancestors are saved on the way
+    def get_closure(self, name):
+        chain = []
+        closure = frozenset()
+        while(name is not None):
+            if(name in self.closures):
+                closure = self.closures[name]
+                break
+            if(name not in self.selectors):
+                # Builtin parent which is not registered yet (before class Main)
+                closure = BUILTIN_CLASSES[name][1]
+                break
+            chain.append(name)
+            name = self.inherits_from.get(name)
+        for class_name in reversed(chain):
+            closure = closure | self.selectors[class_name]
+            self.closures[class_name] = closure
+        return closure
+
+# Semantic errors found during the parse in the order of their priority
+DEFERRED_ERRORS = (Error.SEMERRCOLLISION, Error.SEMERRARIT, Error.SEMERR)
+
+# Tables for semantic analysis of one program (declarations are saved during the parse and checked after it)
+class Parse_Context:
+    def __init__(self):
+        self.reset()
+
+    # Forgets declarations of failed parse (program is parsed again by another parser)
+    def reset(self):
+        self.hierarchy = Class_Hierarchy()
+        self.CLASS_ID = set(BUILTIN_CLASS_ID)
+        self.error = None
+
+    # Semantic error found during the parse is raised only after the parse (syntax error has priority)
+    # Of more errors the one of the deepest node wins as in the original check of the whole tree (it visited
+    # the deepest nodes first) - collision in block, then arity of method and then declaration of class
+    def defer_error(self, error):
+        if((self.error is None) or (DEFERRED_ERRORS.index(error) < DEFERRED_ERRORS.index(self.error))):
+            self.error = error
+
+# Measured phases and counters of one run (option --stats), times are in seconds
+class Parse_Stats:
+    def __init__(self):
+        self.phases = {}
+        self.counters = {}
+
+    # Adds wall and CPU time of the block to phase: with stats.phase("parse"): ...
+    @contextmanager
+    def phase(self, name):
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            wall_total, cpu_total = self.phases.get(name, (0.0, 0.0))
+            self.phases[name] = (wall_total + time.perf_counter() - wall, cpu_total + time.process_time() - cpu)
+
+    def count(self, name, value = 1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    # Counts nodes of AST by their kind
+    def count_ast(self, classes):
+        names = {"class": "classes", "method": "methods", "block": "blocks", "assign": "assigns",
+                 "send": "sends", "expr": "nested_exprs", "var": "vars", "literal": "literals"}
+        for name in names.values():
+            self.count(name, 0)
+        nodes = 0
+        stack = list(classes)
+        while stack:
+            node = stack.pop()
+            nodes += 1
+            tag = node.tag
+            self.counters[names[tag]] += 1
+            if(tag == "class"):
+                stack.extend(node.methods)
+            elif(tag == "method"):
+                stack.append(node.block)
+            elif(tag == "block"):
+                stack.extend(node.assigns)
+            elif(tag == "assign"):
+                stack.append(node.value)
+            elif(tag == "send"):
+                stack.append(node.receiver)
+                stack.extend(node.args)
+            elif(tag == "expr"):
+                stack.append(node.value)
+        self.count("nodes", nodes)
+
+    # Peak resident memory of the process in kB (Linux reports kB, macOS bytes)
+    def get_peak_memory(self):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak // 1024 if sys.platform == "darwin" else peak
+
+    def to_json(self):
+        phases = {name: {"wall": wall, "cpu": cpu} for name, (wall, cpu) in self.phases.items()}
+        return json.dumps({"phases": phases, "counters": self.counters, "peak_memory_kb": self.get_peak_memory()}, indent=2)
+
+    def to_text(self):
+        lines = [f"{'phase':<14}{'wall [ms]':>12}{'cpu [ms]':>12}"]
+        for name, (wall, cpu) in self.phases.items():
+            lines.append(f"{name:<14}{wall * 1000:>12.2f}{cpu * 1000:>12.2f}")
+        for name, value in self.counters.items():
+            lines.append(f"{name:<14}{value:>12}")
+        lines.append(f"{'peak memory':<14}{self.get_peak_memory():>9} kB")
+        return "\n".join(lines)
+
+# Result of parse_sol25
+class Result:
+    def __init__(self, xml, description):
+        self.xml = xml
+        self.description = description
+
+# Own Exceptions (error carries the Error code which should be returned by script)
+class ParseError(Exception):
+    def __init__(self, error):
+        super().__init__(f"{error.name} ({error.value})")
+        self.error = error
+        self.code = error.value
+class SemanticException(ParseError):
+    def __init__(self, error):
+        super().__init__(error)
+class SyntacticException(ParseError):
+    def __init__(self, error = Error.SYNTERR):
+        super().__init__(error)
+
+# Nodes of AST (XML is written from them and semantic checks run on them)
+# Names and selectors are interned, so the same identifier is stored only once for whole program
+class Class_Def:
+    __slots__ = ("name", "parent", "methods")
+    tag = "class"
+
+    def __init__(self, name, parent, methods):
+        self.name = name
+        self.parent = parent
+        self.methods = methods
+class Method:
+    __slots__ = ("selector", "block")
+    tag = "method"
+
+    def __init__(self, selector, block):
+        self.selector = selector
+        self.block = block
+class Block:
+    __slots__ = ("parameters", "assigns")
+    tag = "block"
+
+    def __init__(self, parameters, assigns):
+        self.parameters = parameters
+        self.assigns = assigns
+# Order is position of assignment in block (attribute order in XML)
+class Assign:
+    __slots__ = ("order", "target", "value")
+    tag = "assign"
+
+    def __init__(self, order, target, value):
+        self.order = order
+        self.target = target
+        self.value = value
+# Receiver and arguments are expressions without the parentheses of source code
+class Send:
+    __slots__ = ("selector", "receiver", "args")
+    tag = "send"
+
+    def __init__(self, selector, receiver, args):
+        self.selector = selector
+        self.receiver = receiver
+        self.args = args
+class Var:
+    __slots__ = ("name",)
+    tag = "var"
+
+    def __init__(self, name):
+        self.name = name
+# Kind is value of attribute class in XML (Integer, String, Nil, True, False or class for class literal)
+class Literal:
+    __slots__ = ("kind", "value")
+    tag = "literal"
+
+    def __init__(self, kind, value):
+        self.kind = kind
+        self.value = value
+# Expression in parentheses which is not receiver or argument of send (it is written as nested expr element)
+class Expr:
+    __slots__ = ("value",)
+    tag = "expr"
+
+    def __init__(self, value):
+        self.value = value
+
+# Class dedicated for creation AST from rules of lark grammar, it is used as inline transformer of LALR parser
+# (rules are transformed right after they are reduced, so tree of lark is never created) and it also saves declarations
+# Other backends call its callbacks with the same arguments
+class Transform_AST(Transformer_NonRecursive):
     
+    def __init__(self, context = None):
+        self.start(context)
+
+    # Prepares transformer for the next program (one transformer is bound to the parser of thread)
+    def start(self, context):
+        self.context = context
+
+    # Classes stay separated, root element is written by XML_Writer
     def program(self, args):
-        element = ET.Element("program", {
-            "language": "SOL25",
-        })
-        if(self.description != ""):
-                element.attrib={"language": "SOL25", "description": str(self.description)}
-                
-        for item in args:
-            element.append(item)  
-        return element
+        return args
 
     def class_def(self, args):
-        class_element = args[2] 
-        str_name, str_type = args[0]
-        str_name_par, str_type_par = args[1]
-        class_element.attrib = {
-            "name": str_name,
-            "parent": str_name_par
-        }
-        return class_element
+        class_def = Class_Def(args[0], args[1], args[2])
+        self.declare_class(class_def)
+        return class_def
+
+    # Saves class and its selectors into context (after Main builtin classes respond to class methods too)
+    def declare_class(self, class_def):
+        hierarchy = self.context.hierarchy
+        CLASS_ID = self.context.CLASS_ID
+        if(class_def.name == "Main"):
+            hierarchy.add_builtin_classes()
+
+        if(class_def.name in CLASS_ID):
+            self.context.defer_error(Error.SEMERR)
+            return
+        CLASS_ID.add(class_def.name)
+        selectors = {method.selector for method in class_def.methods}
+        if(hierarchy.has_user_parent(class_def.parent)):
+            self.context.defer_error(Error.SEMERR)
+            return
+        hierarchy.add_class(class_def.name, class_def.parent, selectors)
 
     def cid(self, args):
-        return args[0], "class"
+        return sys.intern(str(args[0]))
     
     def id(self, args):
-        if(str(args[0]) == "nil"):
-            return args[0], "Nil"
-        elif(str(args[0]) == "true"):
-            return args[0], "True"
-        elif(str(args[0]) == "false"):
-            return args[0], "False"
-        elif(args[0] in CLASS_ID):
-            return args[0], "class"
-        return args[0], "identifier"
+        return sys.intern(str(args[0]))
     
     def id_dot(self, args):
-        return args[0], "identifier"
+        return sys.intern(str(args[0]))
     
     def int_def(self, args):
-        return args[0], "Integer"
+        return Literal("Integer", str(args[0]))
     
     def str_def(self, args):
-        str_args = args[0]
-        str_args = str_args[1:-1]
-        return str_args, "String"
+        return Literal("String", str(args[0])[1:-1])
     
     def method(self, args):
-        class_element = ET.Element("class")
-        
+        methods = []
         i = 0
         while i+1 < len(args):
-            element = ET.Element("method", {"selector": args[i]})
-            element.append(args[i+1])
+            # Block has to take as many parameters as selector has parts with colon
+            if(len(args[i+1].parameters) != args[i].count(":")):
+                self.context.defer_error(Error.SEMERRARIT)
+            methods.append(Method(args[i], args[i+1]))
             i+=2
-            class_element.append(element)
-            
-        return class_element
+        return methods
     
     def selector(self, args):
-        element = ""
-        for item in args:
-            val_arg, type_arg = item
-            element = f"{element}{str(val_arg)}"
-        return element
+        return sys.intern("".join(args))
 
     def block(self, args):
-        self.is_in_block = True
-        params = args[0]
-        element = ET.Element("block", {"arity": str(len(params))})
-        i = 1
-        for item in params:
-            val_arg, type_arg = item
-            element_param = ET.Element("parameter", {"order":str(i), "name":str(val_arg)})
-            element.append(element_param)
-            i+=1
-        i = 0
-        step = 1
+        parameters = args[0]
+        names = set()
+        for name in parameters:
+            if(name in names):
+                self.context.defer_error(Error.SEMERRCOLLISION)
+            names.add(name)
         args_args = args[1]
+        # Only the first assigned variable is compared with parameters
+        if((len(args_args) != 0) and (args_args[0] in names)):
+            self.context.defer_error(Error.SEMERRCOLLISION)
+        assigns = []
+        i = 0
         while i < len(args_args):
-            element_ass = ET.Element("assign", {"order": str(step)})
-            val_arg, type_arg = args_args[i]
-            element_var = ET.Element("var", {"name": str(val_arg)})
-            element_ass.append(element_var)
-            element_ass.append(args_args[i+1])
-            element.append(element_ass)
+            assigns.append(Assign(len(assigns) + 1, args_args[i], args_args[i+1]))
             i+=2
-            step+=1
-        self.is_in_block = False
-        return element
+        return Block(tuple(parameters), assigns)
 
     def block_par(self, args):
         return args
@@ -237,172 +472,450 @@ class Transform_XML(Transformer):
         return args
 
     def expr(self, args):
-        element = ET.Element("expr")
-        str_tail, elem_tail = args[1]
-        if(str_tail != ""):
-            element_send = ET.Element("send", {"selector": str_tail})
-            specific_args = args[0]
-            if(contains_substring(str(specific_args), "<Element 'expr'")):
-                element_send.append(specific_args)
-            else:
-                element_expr = ET.Element("expr")
-                element_expr.append(specific_args)
-                element_send.append(element_expr)
-            element.append(element_send)
-        else:
-            element.append(args[0])
-        i = 0
-        
-        # Checking arity for send 
-        if((numOfParams[str_tail] != len(elem_tail)) and (len(numOfParams[str_tail]) != 0)):
-            sys.exit(print_err_by_errnum(Error.SEMERRARIT.value))
-        while i < len(elem_tail):
-            element_arg = ET.Element("arg", {"order": str(i+1)})
-            specific_elem_tail = elem_tail[i]
-            if(contains_substring(str(specific_elem_tail), "<Element 'expr'")):
-                element_arg.append(specific_elem_tail)
-            else:
-                element_expr = ET.Element("expr")
-                element_expr.append(specific_elem_tail)
-                element_arg.append(element_expr)
-            if(str_tail != ""):
-                element_send.append(element_arg)
-            else:
-                element.append(element_arg)
-            i+=1
-        return element
+        selector, send_args = args[1]
+        if(selector == ""):
+            return args[0]
+        # Parentheses around receiver and arguments are not written
+        receiver = args[0].value if (args[0].tag == "expr") else args[0]
+        for i, arg in enumerate(send_args):
+            if(arg.tag == "expr"):
+                send_args[i] = arg.value
+        return Send(selector, receiver, send_args)
 
     def expr_base(self, args):
-        if(len(args[0]) > 1):
-            val_arg, type_arg = args[0]
-            if(type_arg == "identifier"):
-                element_next = ET.Element("var", {"name":val_arg})
-            else:
-                element_next = ET.Element("literal", {"class": type_arg, "value": str(val_arg)})
-            return element_next
         return args[0]
+
+    # Identifier in expression is variable or one of constants nil, true and false
+    def expr_var(self, args):
+        name = args[0]
+        if(name == "nil"):
+            return Literal("Nil", name)
+        elif(name == "true"):
+            return Literal("True", name)
+        elif(name == "false"):
+            return Literal("False", name)
+        return Var(name)
+
+    def expr_class(self, args):
+        return Literal("class", args[0])
+
+    def expr_paren(self, args):
+        return Expr(args[0])
         
+    # Identifiers are strings, arguments are already nodes of AST
     def expr_tail(self, args):
-        selector_str = ""
-        element = []
+        selector = []
+        send_args = []
         for item in args:            
-            if(len(item) > 1):
-                val_arg, type_arg = item
-                selector_str = f"{selector_str}{val_arg}"
+            if(isinstance(item, str)):
+                selector.append(item)
             else:
-                element.append(item)
-        return selector_str, element
-# Class dedicated for taking first comment from AST 
-class Transform_Comments(Transformer):
-    def start(self, args):
-        return args[0]
+                send_args.append(item)
+        return sys.intern("".join(selector)), send_args
 
-    def comment(self, args):
-        return args[0]
+# Marker of the end of block on the stack of XML_Writer (visitor closes scope of its variables there)
+BLOCK_END = object()
 
-# Transition through AST generated by lark grammar
-class Visitor_AST(Visitor):        
-    def class_def(self, tree):
-        self.LastNameOfClass = str(tree.children[0].children[0].value)
-        
-        if(self.LastNameOfClass == "Main"):
-            obj = OBJECT()
-            for item in obj.methods:
-                methodsInClass[item].append("Object")
-            obj = NIL()
-            for item in obj.methods:
-                methodsInClass[item].append("Nil")
-            obj = INTEGER()
-            for item in obj.methods:
-                methodsInClass[item].append("Integer")
-            obj = STRING()
-            for item in obj.methods:
-                methodsInClass[item].append("String")
-            obj = BLOCK()
-            for item in obj.methods:
-                methodsInClass[item].append("Block")
-            obj = FALSE_TRUE()
-            for item in obj.methods:
-                methodsInClass[item].append("True")
-                methodsInClass[item].append("False")
-                
-        if(self.LastNameOfClass in CLASS_ID):
-            sys.exit(print_err_by_errnum(Error.SEMERR.value))
-        CLASS_ID.add(self.LastNameOfClass)
-        i = 0
-        while i < int(len(tree.children[2].children)):
-            iter = 1
-            sel_str = tree.children[2].children[i].children[0].children[0].value
-            while iter < len(tree.children[2].children[i].children):
-                sel_str = f"{sel_str}{tree.children[2].children[i].children[iter].children[0].value}"
-                iter+=1
-            methodsInClass[sel_str].append(self.LastNameOfClass)
-            i+=2
-        
-        obj = 0
-        if(tree.children[1].children[0] == "Object"):
-            obj = OBJECT()
-        elif(tree.children[1].children[0] == "Nil"):
-            obj = NIL()
-        elif(tree.children[1].children[0] == "Integer"):
-            obj = INTEGER()
-        elif(tree.children[1].children[0] == "String"):
-            obj = STRING()
-        elif(tree.children[1].children[0] == "Block"):
-            obj = BLOCK()
-        elif((tree.children[1].children[0] == "True") or (tree.children[1].children[0] == "False")):
-            obj = FALSE_TRUE()
-        else:
-            for key, values in InheritanceRelations.items():
-                if(tree.children[1].children[0] == key):
-                    sys.exit(print_err_by_errnum(Error.SEMERR.value))
-            InheritanceRelations[self.LastNameOfClass].append(tree.children[1].children[0])
-        
-        if(obj == 0):
-            for item in methodsInClass:
-                if(tree.children[1].children[0] in methodsInClass[item]):
-                    methodsInClass[item].append(self.LastNameOfClass)
-        else:    
-            for item in obj.methods:
-                methodsInClass[item].append(self.LastNameOfClass)
-     
-    def method(self, tree):
-        i = 0
-        while i < len(tree.children):
-            iter = 0
-            numberOfParams = 0
-            sel_str = ""
-            while iter < len(tree.children[i].children):
-                if(str(tree.children[i].children[iter].data) == "id_dot"):
-                    sel_str = f"{sel_str}{tree.children[i].children[iter].children[0]}"
-                    numberOfParams += 1
-                iter+=1
-            if(sel_str == ""):
-                sel_str = str(tree.children[i].children[0].children[0])
-            numOfParams[sel_str] = numberOfParams
-            # print(f"{sel_str} + {iter}")
-            
-            if(len(tree.children[i+1].children[0].children) != numOfParams[sel_str]):
-                sys.exit(print_err_by_errnum(Error.SEMERRARIT.value))
-            i += 2
-    
-    def block(self, tree):
-        parameters = []
-        for item in tree.children[0].children:
-            if((item.children[0] in parameters) == False):
-                parameters.append(item.children[0])
+# Writes XML of program incrementally, every class is written right after its parse and then it is dropped
+# Output is the same as from ElementTree, but nodes are serialized with explicit stack (nesting is not limited)
+class XML_Writer:
+    isBinary = False
+
+    def __init__(self, out, attrib):
+        self.out = out
+        self.empty_tag = f"<program{format_attrib(attrib)} />"
+        self.isEmpty = True
+
+    # Start tag of root element is written before the first class
+    def start(self):
+        if(self.isEmpty):
+            self.out.write(f"{self.empty_tag[:-3]}>")
+            self.isEmpty = False
+
+    def write_class(self, class_def, visitor = None):
+        self.start()
+        self.write_nodes(class_def, visitor)
+
+    # XML of class written before (watch mode reuses XML of unchanged classes)
+    def write_text(self, text):
+        self.start()
+        self.out.write(text)
+
+    # Semantic analysis and writing are done in one pass - every node is checked by visitor (if it is given)
+    # right before it is written, so nodes are checked in document order of XML
+    def write_nodes(self, class_def, visitor = None):
+        write = self.out.write
+        # Stack contains nodes and already formatted text (closing tags), identifiers need no escaping
+        stack = [class_def]
+        while stack:
+            node = stack.pop()
+            if(isinstance(node, str)):
+                write(node)
+                continue
+            if(node is BLOCK_END):
+                visitor.end_block()
+                continue
+            tag = node.tag
+            if(tag == "class"):
+                if(visitor is not None):
+                    visitor.check_class(node)
+                if(len(node.methods) == 0):
+                    write(f'<class name="{node.name}" parent="{node.parent}" />')
+                    continue
+                write(f'<class name="{node.name}" parent="{node.parent}">')
+                stack.append("</class>")
+                stack.extend(reversed(node.methods))
+            elif(tag == "method"):
+                if(visitor is not None):
+                    visitor.check_method(node)
+                write(f'<method selector="{node.selector}">')
+                stack.append("</method>")
+                stack.append(node.block)
+            elif(tag == "block"):
+                if((len(node.parameters) == 0) and (len(node.assigns) == 0)):
+                    write(f'<block arity="0" />')
+                    continue
+                if(visitor is not None):
+                    visitor.check_block(node)
+                    # Variables of block are forgotten behind its last node
+                    stack.append(BLOCK_END)
+                write(f'<block arity="{len(node.parameters)}">')
+                for i, name in enumerate(node.parameters, 1):
+                    if(visitor is not None):
+                        visitor.check_parameter(name)
+                    write(f'<parameter order="{i}" name="{name}" />')
+                stack.append("</block>")
+                stack.extend(reversed(node.assigns))
+            elif(tag == "assign"):
+                if(visitor is not None):
+                    visitor.check_assign(node)
+                write(f'<assign order="{node.order}"><var name="{node.target}" /><expr>')
+                stack.append("</expr></assign>")
+                stack.append(node.value)
+            elif(tag == "send"):
+                if(visitor is not None):
+                    visitor.check_send(node)
+                write(f'<send selector="{node.selector}"><expr>')
+                stack.append("</send>")
+                for i in range(len(node.args), 0, -1):
+                    stack.append("</expr></arg>")
+                    stack.append(node.args[i-1])
+                    stack.append(f'<arg order="{i}"><expr>')
+                stack.append("</expr>")
+                stack.append(node.receiver)
+            elif(tag == "expr"):
+                write("<expr>")
+                stack.append("</expr>")
+                stack.append(node.value)
+            elif(tag == "var"):
+                if(visitor is not None):
+                    visitor.check_var(node)
+                write(f'<var name="{node.name}" />')
             else:
-                sys.exit(print_err_by_errnum(Error.SEMERRCOLLISION.value))
-        
-        # I made this because of problem with children 
-        for item in tree.children[1].children:
-            if(item.children[0] in parameters):
-                sys.exit(print_err_by_errnum(Error.SEMERRCOLLISION.value))
+                if(visitor is not None):
+                    visitor.check_literal(node)
+                write(f'<literal class="{node.kind}" value="{escape_attrib(node.value)}" />')
+
+    def end(self):
+        if(self.isEmpty):
+            self.out.write(self.empty_tag)
+        else:
+            self.out.write("</program>")
+
+# Writers of flat encodings of the same tree (option --format jsonl and bin) - every class is written as one record
+# with its name, parent and nodes of its methods in postorder (children before their parent), so loaders build
+# the tree with one stack and nesting is not limited; semantic checks are called in the same order as by XML_Writer
+# Nodes: var name | literal kind value | expr (parentheses) | send selector number_of_args (after receiver and args)
+# | assign target | block number_of_parameters parameters... number_of_assigns | method selector
+class Flat_Writer:
+    isBinary = False
+
+    def __init__(self, out, attrib):
+        self.out = out
+        self.attrib = attrib
+        self.isEmpty = True
+
+    # Header is written before the first class
+    def start(self):
+        if(self.isEmpty):
+            self.write_header()
+            self.isEmpty = False
+
+    def write_class(self, class_def, visitor = None):
+        self.start()
+        self.write_nodes(class_def, visitor)
+
+    # Record of class written before (parallel parse encodes classes in worker processes)
+    def write_text(self, text):
+        self.start()
+        self.out.write(text)
+
+    def end(self):
+        self.start()
+
+    # Returns nodes of methods of class, strings are converted by string and tags are taken from TAGS
+    def encode_nodes(self, class_def, visitor, string):
+        tags = self.TAGS
+        nodes = []
+        # Stack contains nodes and already encoded parents (written after their children)
+        stack = [class_def]
+        while stack:
+            node = stack.pop()
+            if(isinstance(node, tuple)):
+                nodes.extend(node)
+                continue
+            if(node is BLOCK_END):
+                visitor.end_block()
+                continue
+            tag = node.tag
+            if(tag == "class"):
+                if(visitor is not None):
+                    visitor.check_class(node)
+                stack.extend(reversed(node.methods))
+            elif(tag == "method"):
+                if(visitor is not None):
+                    visitor.check_method(node)
+                stack.append((tags["method"], string(node.selector)))
+                stack.append(node.block)
+            elif(tag == "block"):
+                if((len(node.parameters) == 0) and (len(node.assigns) == 0)):
+                    nodes.extend((tags["block"], 0, 0))
+                    continue
+                if(visitor is not None):
+                    visitor.check_block(node)
+                    stack.append(BLOCK_END)
+                    for name in node.parameters:
+                        visitor.check_parameter(name)
+                stack.append((tags["block"], len(node.parameters), *map(string, node.parameters), len(node.assigns)))
+                stack.extend(reversed(node.assigns))
+            elif(tag == "assign"):
+                if(visitor is not None):
+                    visitor.check_assign(node)
+                stack.append((tags["assign"], string(node.target)))
+                stack.append(node.value)
+            elif(tag == "send"):
+                if(visitor is not None):
+                    visitor.check_send(node)
+                stack.append((tags["send"], string(node.selector), len(node.args)))
+                stack.extend(reversed(node.args))
+                stack.append(node.receiver)
+            elif(tag == "expr"):
+                stack.append((tags["expr"],))
+                stack.append(node.value)
+            elif(tag == "var"):
+                if(visitor is not None):
+                    visitor.check_var(node)
+                nodes.extend((tags["var"], string(node.name)))
             else:
-                break
-# Recursive transition through XML tree 
-class Visitor_XML:
+                if(visitor is not None):
+                    visitor.check_literal(node)
+                nodes.extend((tags["literal"], string(node.kind), string(node.value)))
+        return nodes
+
+# JSON Lines - the first line is object with attributes of program, every next line is object of one class
+# {"class": name, "parent": parent, "nodes": [...]} with tags and strings written in nodes as they are
+class JSONL_Writer(Flat_Writer):
+    TAGS = {tag: tag for tag in ("var", "literal", "expr", "send", "assign", "block", "method")}
+
+    def write_header(self):
+        self.out.write(json.dumps(self.attrib, ensure_ascii=False) + "\n")
+
+    def write_nodes(self, class_def, visitor = None):
+        nodes = self.encode_nodes(class_def, visitor, str)
+        record = {"class": class_def.name, "parent": class_def.parent, "nodes": nodes}
+        self.out.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+# Binary encoding (little endian) - header BIN_MAGIC, length of description and description in UTF-8, then record
+# of every class: its length, BIN_RECORD (width of numbers 2 or 4 bytes, number of strings, length of UTF-8 text
+# of strings, number of nodes), lengths of strings (in characters), nodes and text of strings
+# Bytes of stdin which are not UTF-8 stay in the text as they were read (surrogateescape)
+# Strings (names, selectors and values) are numbers in string table of the record, the first two nodes are name
+# and parent of class
+BIN_MAGIC = b"SOL25\x00\x01"
+BIN_RECORD = struct.Struct("<BIII")
+BIN_TAGS = {"var": 1, "literal": 2, "expr": 3, "send": 4, "assign": 5, "block": 6, "method": 7}
+
+class Binary_Writer(Flat_Writer):
+    isBinary = True
+    TAGS = BIN_TAGS
+
+    def write_header(self):
+        description = self.attrib.get("description", "").encode("utf-8", errors="surrogateescape")
+        self.out.write(BIN_MAGIC + struct.pack("<I", len(description)) + description)
+
+    def write_nodes(self, class_def, visitor = None):
+        table = {}
+        string = lambda value: table.setdefault(value, len(table))
+        nodes = [string(class_def.name), string(class_def.parent)]
+        nodes.extend(self.encode_nodes(class_def, visitor, string))
+        lengths = [len(value) for value in table]
+        text = "".join(table).encode("utf-8", errors="surrogateescape")
+        numbers = array.array("H" if max(max(nodes), max(lengths)) < (1 << 16) else "I", lengths)
+        numbers.extend(nodes)
+        if(sys.byteorder == "big"):
+            numbers.byteswap()
+        record = BIN_RECORD.pack(numbers.itemsize, len(lengths), len(text), len(nodes)) + numbers.tobytes() + text
+        self.out.write(struct.pack("<I", len(record)) + record)
+
+# Writer of every output format (option --format)
+WRITERS = {"xml": XML_Writer, "jsonl": JSONL_Writer, "bin": Binary_Writer}
+OUTPUT_SUFFIXES = {"xml": ".xml", "jsonl": ".jsonl", "bin": ".bin"}
+
+# Loaders of outputs for programs which read them (interpreter), every one returns description of program and list
+# of classes (Class_Def with the same AST as Transform_AST creates), trees are built without recursion
+def load_xml(text):
+    import xml.etree.ElementTree as ET
+    stack = []
+    description = ""
+    # Every expr element is wrapped into Expr, elements holding expression take it out of the wrapper
+    for _, elem in ET.iterparse(io.StringIO(text), events=("end",)):
+        tag = elem.tag
+        if(tag == "var"):
+            stack.append(Var(elem.get("name")))
+        elif(tag == "literal"):
+            stack.append(Literal(elem.get("class"), elem.get("value")))
+        elif(tag == "expr"):
+            stack[-1] = Expr(stack[-1])
+        elif(tag == "arg"):
+            stack[-1] = stack[-1].value
+        elif(tag == "send"):
+            count = len(elem) - 1
+            args = stack[len(stack) - count:]
+            del stack[len(stack) - count:]
+            stack[-1] = Send(elem.get("selector"), stack[-1].value, args)
+        elif(tag == "assign"):
+            value = stack.pop().value
+            stack[-1] = Assign(int(elem.get("order")), stack[-1].name, value)
+        elif(tag == "block"):
+            parameters = tuple(child.get("name") for child in elem if child.tag == "parameter")
+            count = len(elem) - len(parameters)
+            assigns = stack[len(stack) - count:]
+            del stack[len(stack) - count:]
+            stack.append(Block(parameters, assigns))
+        elif(tag == "method"):
+            stack[-1] = Method(elem.get("selector"), stack[-1])
+        elif(tag == "class"):
+            count = len(elem)
+            methods = stack[len(stack) - count:]
+            del stack[len(stack) - count:]
+            stack.append(Class_Def(elem.get("name"), elem.get("parent"), methods))
+        elif(tag == "program"):
+            description = elem.get("description", "")
+        # Parameters are read by their block
+        if(tag != "parameter"):
+            elem.clear()
+    return description, stack
+
+def load_jsonl(text):
+    lines = text.splitlines()
+    description = json.loads(lines[0]).get("description", "")
+    classes = []
+    for line in lines[1:]:
+        record = json.loads(line)
+        classes.append(Class_Def(record["class"], record["parent"], decode_nodes(record["nodes"], 0, None)))
+    return description, classes
+
+def load_bin(data):
+    if(data[:len(BIN_MAGIC)] != BIN_MAGIC):
+        raise ValueError("not SOL25 binary output")
+    position = len(BIN_MAGIC)
+    (length,) = struct.unpack_from("<I", data, position)
+    position += 4
+    description = data[position:position + length].decode("utf-8", errors="surrogateescape")
+    position += length
+    classes = []
+    while position < len(data):
+        (length,) = struct.unpack_from("<I", data, position)
+        end = position + 4 + length
+        width, num_strings, text_length, num_nodes = BIN_RECORD.unpack_from(data, position + 4)
+        position += 4 + BIN_RECORD.size
+        numbers = array.array("H" if width == 2 else "I")
+        numbers.frombytes(data[position:end - text_length])
+        if(sys.byteorder == "big"):
+            numbers.byteswap()
+        text = data[end - text_length:end].decode("utf-8", errors="surrogateescape")
+        strings = []
+        start = 0
+        for i in range(num_strings):
+            strings.append(text[start:start + numbers[i]])
+            start += numbers[i]
+        nodes = numbers[num_strings:]
+        classes.append(Class_Def(strings[nodes[0]], strings[nodes[1]], decode_nodes(nodes, 2, strings)))
+        position = end
+    return description, classes
+
+# Returns methods built from nodes in postorder starting at position, strings are taken from string table
+# (None when strings are written in nodes as they are)
+def decode_nodes(nodes, position, strings):
+    if(strings is None):
+        tags = JSONL_Writer.TAGS
+        string = lambda value: value
+    else:
+        tags = BIN_TAGS
+        string = strings.__getitem__
+    VAR, LITERAL, EXPR, SEND = tags["var"], tags["literal"], tags["expr"], tags["send"]
+    ASSIGN, BLOCK, METHOD = tags["assign"], tags["block"], tags["method"]
+    stack = []
+    end = len(nodes)
+    while position < end:
+        tag = nodes[position]
+        if(tag == VAR):
+            stack.append(Var(string(nodes[position + 1])))
+            position += 2
+        elif(tag == LITERAL):
+            stack.append(Literal(string(nodes[position + 1]), string(nodes[position + 2])))
+            position += 3
+        elif(tag == SEND):
+            count = nodes[position + 2]
+            args = stack[len(stack) - count:]
+            del stack[len(stack) - count:]
+            stack[-1] = Send(string(nodes[position + 1]), stack[-1], args)
+            position += 3
+        elif(tag == ASSIGN):
+            stack[-1] = Assign(0, string(nodes[position + 1]), stack[-1])
+            position += 2
+        elif(tag == BLOCK):
+            count = nodes[position + 1]
+            parameters = tuple(map(string, nodes[position + 2:position + 2 + count]))
+            position += 2 + count
+            count = nodes[position]
+            assigns = stack[len(stack) - count:]
+            del stack[len(stack) - count:]
+            for i, assign in enumerate(assigns, 1):
+                assign.order = i
+            stack.append(Block(parameters, assigns))
+            position += 1
+        elif(tag == METHOD):
+            stack[-1] = Method(string(nodes[position + 1]), stack[-1])
+            position += 2
+        elif(tag == EXPR):
+            stack[-1] = Expr(stack[-1])
+            position += 1
+        else:
+            raise ValueError(f"unknown node {tag!r}")
+    return stack
+
+LOADERS = {"xml": load_xml, "jsonl": load_jsonl, "bin": load_bin}
+
+# Lexer callback for ignored COMMENT terminal, it saves the first comment of program (description)
+class Comment_Collector:
     def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.first_comment = ""
+        self.isFound = False
+
+    def __call__(self, token):
+        if(self.isFound == False):
+            self.first_comment = str(token)
+            self.isFound = True
+        return token
+
+# Semantic checks of AST nodes, they are called by XML_Writer in document order (state is kept between nodes)
+class Visitor_AST:
+    def __init__(self, context):
+        self.context = context
         self.isInsideSend = False
         self.isMain = False
         self.isRun = False
@@ -410,186 +923,1580 @@ class Visitor_XML:
         self.LastNameOfClass = ""
         self.LastNameOfMethod = ""
         
-        self.defined_vars = []
-        self.isEnableToDefVar = False
+        # Variables visible in the current block (its parameters and assigned variables and the ones of blocks
+        # around it), every open block keeps set of names it added, they are removed when the block ends
+        self.defined_vars = set()
+        self.scopes = []
         
-        # There is no one error
-        self.errNum = 0
-        
-    def traverse(self, element):
-        self.atribut_name = ""
-        # print(f"Element = {element.tag}")
-        if(element.tag == "class"):
-            if (element.attrib['parent'] in CLASS_ID):
-                if(element.attrib['name'] == "Main"):
-                    if(self.isMain):
-                        self.errNum = Error.SEMERRMAIN.value
-                    self.isMain = True
-                else:
-                    self.atribut_name = element.attrib['name'] 
-                self.LastNameOfClass = element.attrib['name'] 
-            else:
-                self.errNum = Error.SEMERRUNDEF.value
-        elif(element.tag == "method"):
-            if((element.attrib['selector'] == "run") and self.isMain):
-                self.isRun = True
-            self.atribut_name = element.attrib['selector'] 
-        elif(element.tag == "assign"):
-            self.isInsideSend = False
-            self.isEnableToDefVar = True
-        elif(element.tag == "send"):
-            self.isInsideSend = True
-            self.atribut_name = element.attrib['selector'] 
-            self.LastNameOfMethod = element.attrib['selector'] 
-        elif(element.tag == "parameter"):
-            self.defined_vars.append(element.attrib['name'])
-            self.atribut_name = element.attrib['name'] 
-        elif(element.tag == "literal"):
-            if(element.attrib['value'] != "nil" and element.attrib['value'] != "false" and element.attrib['value'] != "true"):
-                self.atribut_name = element.attrib['value'] 
-            # print(f"method: {self.LastNameOfMethod} class:{methodsInClass[self.LastNameOfMethod]}")
-            if((element.attrib['class'] == "class")):
-                if(((element.attrib['value'] in methodsInClass[self.LastNameOfMethod]) == False)):
-                    self.errNum = Error.SEMERRUNDEF.value                
-                    
-        elif(element.tag == "var"):
-            if(((element.attrib['name'] == "self") and (self.isInsideSend == False)) or (element.attrib['name'] != "self")):
-                self.atribut_name = element.attrib['name'] 
-            if(self.isEnableToDefVar):
-                self.defined_vars.append(element.attrib['name'])
-                self.isEnableToDefVar = False
-            elif(((element.attrib['name'] in self.defined_vars) == False) and (element.attrib['name'] != "self")):
-                self.errNum = Error.SEMERRUNDEF.value
-                
-        if self.atribut_name in KEYWORDS :
-            raise SyntacticException("ERROR")
-        elif(self.errNum != 0):
-            raise SemanticException("ERROR")
-        
-        for child in element:
-            self.traverse(child)
+    def check_class(self, node):
+        if(node.parent not in self.context.CLASS_ID):
+            raise SemanticException(Error.SEMERRUNDEF)
+        self.LastNameOfClass = node.name
+        if(node.name == "Main"):
+            if(self.isMain):
+                raise SemanticException(Error.SEMERRMAIN)
+            self.isMain = True
+        else:
+            self.check_name(node.name)
 
-# If function find substring return true
-def contains_substring(text, substring):
-    return substring in text
-# Prints error status
-def print_err_by_errnum(value):
+    def check_method(self, node):
+        if((node.selector == "run") and self.isMain):
+            self.isRun = True
+        self.check_name(node.selector)
+
+    def check_block(self, node):
+        self.scopes.append(set())
+
+    def end_block(self):
+        self.defined_vars -= self.scopes.pop()
+
+    def define_var(self, name):
+        if(name not in self.defined_vars):
+            self.defined_vars.add(name)
+            self.scopes[-1].add(name)
+
+    def check_parameter(self, name):
+        self.define_var(name)
+        self.check_name(name)
+
+    # Assigned variable is defined (also self, which is keyword)
+    def check_assign(self, node):
+        self.isInsideSend = False
+        self.define_var(node.target)
+        self.check_name(node.target)
+
+    def check_send(self, node):
+        self.isInsideSend = True
+        self.LastNameOfMethod = node.selector
+        self.check_name(node.selector)
+
+    def check_var(self, node):
+        if(((node.name == "self") and (self.isInsideSend == False)) or (node.name != "self")):
+            self.check_name(node.name)
+        if(((node.name in self.defined_vars) == False) and (node.name != "self")):
+            raise SemanticException(Error.SEMERRUNDEF)
+
+    def check_literal(self, node):
+        if(node.value != "nil" and node.value != "false" and node.value != "true"):
+            self.check_name(node.value)
+        if((node.kind == "class")):
+            if(self.context.hierarchy.has_selector(node.value, self.LastNameOfMethod) == False):
+                raise SemanticException(Error.SEMERRUNDEF)
+
+    # Keyword used as name is syntax error
+    def check_name(self, name):
+        if name in KEYWORDS :
+            raise SyntacticException()
+
+# Escapes value of XML attribute in the same way as ElementTree
+def escape_attrib(text):
+    if("&" in text):
+        text = text.replace("&", "&amp;")
+    if("<" in text):
+        text = text.replace("<", "&lt;")
+    if(">" in text):
+        text = text.replace(">", "&gt;")
+    if("\"" in text):
+        text = text.replace("\"", "&quot;")
+    if("\r" in text):
+        text = text.replace("\r", "&#13;")
+    if("\n" in text):
+        text = text.replace("\n", "&#10;")
+    if("\t" in text):
+        text = text.replace("\t", "&#09;")
+    return text
+# Returns attributes of element formatted for start tag
+def format_attrib(attrib):
+    return "".join(f' {name}="{escape_attrib(value)}"' for name, value in attrib.items())
+# Returns path of the cache file for grammar (key = grammar text + Lark version + Python version)
+# File which is not regular file of the current user is never loaded (Lark unpickles it), None disables the cache
+def get_cache_path(grammar_str):
+    if(cache_dir == ""):
+        return None
+    key = f"{grammar_str}{lark_version}{sys.version_info[:2]}"
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+    path = os.path.join(cache_dir, f".sol25_lark_{os.getuid()}_{digest}.cache")
+    try:
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        stat = os.lstat(path)
+    except FileNotFoundError:
+        return path
+    except OSError:
+        return None
+    if((not S_ISREG(stat.st_mode)) or (stat.st_uid != os.getuid())):
+        return None
+    return path
+# Creates LALR parser, analysed tables are loaded from cache when possible
+# (Lark checks hash stored in the file and on any problem it rebuilds the tables and rewrites the file)
+# Parser with transformer returns result of the transformer instead of the tree
+def create_parser(grammar_str, lexer_callbacks=None, transformer=None):
+    if(lexer_callbacks is None):
+        lexer_callbacks = {}
+    cache_path = get_cache_path(grammar_str)
+    if(cache_path is None):
+        return Lark(grammar_str, parser="lalr", lexer_callbacks=lexer_callbacks, transformer=transformer)
+    return Lark(grammar_str, parser="lalr", lexer_callbacks=lexer_callbacks, transformer=transformer, cache=cache_path)
+# Returns message of error status
+def get_err_message(value):
     match value:
         case Error.WRONGPARAM.value:
-            sys.stderr.write("- chybejici parametr skriptu (je-li treba) nebo použiti zakazane kombinace parametru\n")
-            return value
+            return "- chybejici parametr skriptu (je-li treba) nebo použiti zakazane kombinace parametru\n"
+        case Error.INFILEERR.value:
+            return "- chyba při otevírání vstupních souborů\n"
+        case Error.OUTFILEERR.value:
+            return "- chyba při otevření výstupních souborů pro zápis\n"
         case Error.LEXERR.value:
-            sys.stderr.write("- lexikalni chyba ve zdrojovem kodu v SOL25\n")
-            return value
+            return "- lexikalni chyba ve zdrojovem kodu v SOL25\n"
         case Error.SYNTERR.value:
-            sys.stderr.write("- syntaktická chyba ve zdrojovém kódu v SOL25\n")
-            return value
+            return "- syntaktická chyba ve zdrojovém kódu v SOL25\n"
         case Error.SEMERRMAIN.value:
-            sys.stderr.write("- sémantická chyba - chybějící třída Main či její instanční metoda run.\n")
-            return value
+            return "- sémantická chyba - chybějící třída Main či její instanční metoda run.\n"
         case Error.SEMERRUNDEF.value:
-            sys.stderr.write("- sémantická chyba - použití nedefinované (a tedy i neinicializované) proměnné, formálního parametru, třídy, nebo třídní metody.\n")
-            return value
+            return "- sémantická chyba - použití nedefinované (a tedy i neinicializované) proměnné, formálního parametru, třídy, nebo třídní metody.\n"
         case Error.SEMERRARIT.value:
-            sys.stderr.write("- sémantická chyba arity (špatná arita bloku přiřazeného k selektoru při definici instanční\n")
-            return value
+            return "- sémantická chyba arity (špatná arita bloku přiřazeného k selektoru při definici instanční\n"
         case Error.SEMERRCOLLISION.value:
-            sys.stderr.write("- sémantická chyba - kolizní proměnná (lokální proměnná koliduje s formálním parametrem bloku\n")
-            return value
+            return "- sémantická chyba - kolizní proměnná (lokální proměnná koliduje s formálním parametrem bloku\n"
         case Error.SEMERR.value:
-            sys.stderr.write("- sémantická chyba - ostatní\n")
-            return value
+            return "- sémantická chyba - ostatní\n"
         case Error.INTERNERR.value:
-            sys.stderr.write("- interni chyba (neovlivnena integraci, vstupnimi soubory ci parametry prikazove radky)\n")
-            return value
+            return "- interni chyba (neovlivnena integraci, vstupnimi soubory ci parametry prikazove radky)\n"
         case _:
-            sys.stderr.write("- not defined err print)\n")
-            return value
+            return "- not defined err print)\n"
+# Prints error status
+def print_err_by_errnum(value):
+    sys.stderr.write(get_err_message(value))
+    return value
 
 def print_helping_guide():
     print("Printed helping guides")
     print("-------------------------------------------------------------------------------------------")
+    print("python3.11 parse.py < vstup.SOL25 > vystup.xml")
+    print("python3.11 parse.py --batch DIR --out DIR [--jobs N]")
+    print("    - překlad všech souborů *.SOL25 a *.sol z DIR (i podadresáře) v N procesech (výchozí počet jader),")
+    print("      XML se uloží do --out DIR se stejnou strukturou a návratové kódy do souboru manifest.txt")
+    print("python3.11 parse.py --serve[=SOCKET]")
+    print("    - server s připraveným parserem na Unix socketu (klient parse_client.py se používá stejně jako parse.py)")
+    print("python3.11 parse.py --jobs N < vstup.SOL25 > vystup.xml")
+    print("    - velký program (od 1 MB) parsuje po částech s celými třídami v N procesech, výstup je stejný")
+    print("python3.11 parse.py --stats[=json] [--stats-file FILE] [--profile[=FILE]] < vstup.SOL25 > vystup.xml")
+    print("    - čas (reálný a CPU) jednotlivých fází, počty tokenů a uzlů a maximální paměť na stderr (nebo do FILE),")
+    print("      --profile vypíše profil cProfile na stderr (nebo ho uloží do FILE pro pstats)")
+    print("python3.11 parse.py --backend NAME ...")
+    print("    - parser: lark-lalr (výchozí), lark-earley, parglare, parsy nebo descent (ručně psaný),")
+    print("      všechny mají stejný výstup, liší se rychlostí, lze použít i s --batch")
+    print("python3.11 parse.py --cache DIR [--cache-size MB] ...")
+    print("    - výsledek (XML nebo návratový kód) se uloží do DIR a pro stejný vstup se použije bez překladu,")
+    print("      nejdéle nepoužité záznamy se mažou nad MB megabajtů (výchozí 64), lze použít i s --batch")
+    print("python3.11 parse.py --watch FILE [--backend NAME]")
+    print("    - po každé změně FILE vypíše XML na stdout (návratový kód a čas na stderr), ukončení Ctrl+C,")
+    print("      znovu se překládají jen změněné třídy")
+    print("python3.11 parse.py --format xml|jsonl|bin ...")
+    print("    - formát výstupu: XML (výchozí), JSON Lines (hlavička a jedna třída na řádek) nebo binární")
+    print("      s tabulkou řetězců, uzly tříd jsou v postfixovém pořadí, lze použít i s --batch a --jobs")
+    print("-------------------------------------------------------------------------------------------")
     print("10  - chybějící parametr skriptu (je-li třeba) nebo použití zakázané kombinace parametrů;")
     print("11  - chyba při otevírání vstupních souborů (např. neexistence, nedostatečné oprávnění);")
     print("12  - chyba při otevření výstupních souborů pro zápis (např. nedostatečné oprávnění, chyba při zápisu);")
     print("20–69 - návratové kódy chyb specifických pro jednotlivé skripty;")
     print("99  - interní chyba (neovlivněná integrací, vstupními soubory či parametry příkazové řádky).")
+# Options of script (True if option needs value)
+NO_VALUE, VALUE, OPTIONAL_VALUE = range(3)
+OPTIONS = {"--help": NO_VALUE, "-h": NO_VALUE, "--batch": VALUE, "--out": VALUE, "--jobs": VALUE, "--serve": OPTIONAL_VALUE,
+           "--stats": OPTIONAL_VALUE, "--stats-file": VALUE, "--profile": OPTIONAL_VALUE, "--backend": VALUE,
+           "--cache": VALUE, "--cache-size": VALUE, "--watch": VALUE, "--format": VALUE}
+# Returns dictionary of used options (--name value or --name=value, optional value only --name=value),
+# wrong combination ends with error 10
 def Argument_parser():
+    options = {}
+    # In debug mode the first argument is input file
+    if(isdebug):
+        return options
+    args = sys.argv[1:]
+    i = 0
+    while i < len(args):
+        name, separator, value = args[i].partition("=")
+        if((name not in OPTIONS) or (name in options)):
+            sys.exit(print_err_by_errnum(Error.WRONGPARAM.value))
+        if(OPTIONS[name] == VALUE):
+            if(separator == ""):
+                i += 1
+                if(i >= len(args)):
+                    sys.exit(print_err_by_errnum(Error.WRONGPARAM.value))
+                value = args[i]
+            options[name] = value
+        elif(OPTIONS[name] == OPTIONAL_VALUE):
+            options[name] = value if separator != "" else True
+        elif(separator != ""):
+            sys.exit(print_err_by_errnum(Error.WRONGPARAM.value))
+        else:
+            options[name] = True
+        i += 1
+
+    if(("--help" in options) or ("-h" in options)):
+        if(len(options) != 1):
+            sys.exit(print_err_by_errnum(Error.WRONGPARAM.value))
+        print_helping_guide()
+        sys.exit(0)
+    # Output directory makes sense only in batch mode, processes parse files of batch or classes of one program
+    if(("--batch" in options) != ("--out" in options)):
+        sys.exit(print_err_by_errnum(Error.WRONGPARAM.value))
+    if("--jobs" in options):
+        if((not options["--jobs"].isdigit()) or (int(options["--jobs"]) < 1)):
+            sys.exit(print_err_by_errnum(Error.WRONGPARAM.value))
+    if(("--serve" in options) and (len(options) != 1)):
+        sys.exit(print_err_by_errnum(Error.WRONGPARAM.value))
+    # Statistics and profile are made only for translation of one program
+    if(("--stats" in options) or ("--profile" in options)):
+        if("--batch" in options):
+            sys.exit(print_err_by_errnum(Error.WRONGPARAM.value))
+        if(options.get("--stats", True) not in (True, "text", "json")):
+            sys.exit(print_err_by_errnum(Error.WRONGPARAM.value))
+    if(("--stats-file" in options) and ("--stats" not in options)):
+        sys.exit(print_err_by_errnum(Error.WRONGPARAM.value))
+    if(("--backend" in options) and (options["--backend"] not in BACKENDS)):
+        sys.exit(print_err_by_errnum(Error.WRONGPARAM.value))
+    if(("--format" in options) and (options["--format"] not in WRITERS)):
+        sys.exit(print_err_by_errnum(Error.WRONGPARAM.value))
+    # Watch mode translates only the watched file (parser can be chosen)
+    if(("--watch" in options) and any(name not in ("--watch", "--backend") for name in options)):
+        sys.exit(print_err_by_errnum(Error.WRONGPARAM.value))
+    # Limit of cache is whole number of megabytes
+    if("--cache-size" in options):
+        if(("--cache" not in options) or (not options["--cache-size"].isdigit()) or (int(options["--cache-size"]) < 1)):
+            sys.exit(print_err_by_errnum(Error.WRONGPARAM.value))
+    return options
+# Reads the source code from stdin (or from file in debug mode)
+def read_input():
+    global input_file
     if (isdebug):
         if(input_file == ""):
             input_file = sys.argv[1]
         debug = Debug(isdebug, input_file)
         return debug.read_from_input_file()
-    elif(len(sys.argv) == 1):
-        return sys.stdin.read()  # Read all input
-    elif (len(sys.argv) == 2):
-        if (sys.argv[1] == "--help" or sys.argv[1] == "-h"):
-            print_helping_guide()
-            sys.exit(0)
+    return sys.stdin.read()  # Read all input
+
+# Parser backends (option --backend) - every backend returns list of classes (AST) built by callbacks of Transform_AST,
+# so declarations and semantic errors are the same for all of them, and the first comment of program
+DEFAULT_BACKEND = "lark-lalr"
+
+# Whitespace and comments between terminals and start of any terminal of grammar (for backends without lark lexer)
+LAYOUT_RE = re.compile(r'(?:[ \t\f\r\n]+|"[^"]*")*')
+# String literal on one line with escape sequences \' \n \\ (the same as str_def of grammar), every character
+# is matched by a character class of the loop, so the match never backtracks over the rest of line
+STRING_PATTERN = r"'[^'\\\n]*(?:\\['n\\][^'\\\n]*)*'"
+TERMINAL_RE = re.compile(r"[a-zA-Z_][a-zA-Z0-9_]*:?|-?\d|" + STRING_PATTERN + r"|:=|[:{}\[\]|.()]")
+ID_BEFORE_RE = re.compile(r"(?<![a-zA-Z0-9_])[a-z_][a-zA-Z0-9_]*[ \t\f\r\n]+$")
+# Tokens which can contain quotation mark or apostrophe (the other characters are skipped in runs)
+COMMENT_SCAN_RE = re.compile(r"""[ \t\f\r\n]+|("[^"]*")|""" + STRING_PATTERN + r"""|[^ \t\f\r\n"']+|.""")
+
+# Error of failed parse at position - lexical error when no terminal of grammar starts there
+# (contextual lexer of lark decides in the same way), otherwise unexpected token (syntax error)
+def get_error(source, position):
+    position = LAYOUT_RE.match(source, max(position, 0)).end()
+    # Behind identifier and layout (lookahead of its reduction contains ":=") lark reads ":=" as one token,
+    # the other backends fail behind the colon
+    if((position > 0) and source.startswith(":=", position - 1) and (ID_BEFORE_RE.search(source, 0, position - 1) is not None)):
+        position -= 1
+    return get_terminal_error(source, position)
+
+# Error at position after layout, where contextual lexer did not read any terminal
+def get_terminal_error(source, position):
+    if((position >= len(source)) or (TERMINAL_RE.match(source, position) is not None)):
+        return Error.SYNTERR
+    return Error.LEXERR
+
+# Returns the first comment of source (string literals are skipped, they can contain quotation mark)
+def find_first_comment(source):
+    for match in COMMENT_SCAN_RE.finditer(source):
+        if(match.group(1) is not None):
+            return match.group(1)
+    return ""
+
+# Calls callbacks of transformer for tree of lark in postorder without recursion
+# (inline transformer of LALR parser calls them in the same order)
+def transform_tree(transformer, tree):
+    results = []
+    stack = [(tree, False)]
+    while stack:
+        node, isReduced = stack.pop()
+        if(isReduced):
+            start = len(results) - len(node.children)
+            args = results[start:]
+            del results[start:]
+            results.append(getattr(transformer, node.data)(args))
+        elif(isinstance(node, str)):
+            results.append(node)
         else:
-            sys.exit(print_err_by_errnum(Error.WRONGPARAM.value)) 
-            
-    else:
-        sys.exit(print_err_by_errnum(Error.WRONGPARAM.value))
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(node.children))
+    return results[0]
 
-def main():
-    global isdebug
-    global input_file
-    
-    data = Argument_parser()
+# LALR parser of lark (or standalone parser generated from the same grammar) with inline transformer
+class Lark_LALR_Backend:
+    def __init__(self):
+        self.comments = Comment_Collector()
+        self.transformer = Transform_AST()
+        if(standalone is not None):
+            self.parser = standalone.Lark_StandAlone(transformer=self.transformer, lexer_callbacks={"COMMENT": self.comments})
+        else:
+            self.parser = create_parser(grammar, {"COMMENT": self.comments}, self.transformer)
+
+    def parse(self, source, context):
+        self.comments.reset()
+        self.transformer.start(context)
+        try:
+            classes = self.parser.parse(source)
+        except UnexpectedCharacters:
+            raise ParseError(Error.LEXERR)
+        except UnexpectedToken:
+            raise ParseError(Error.SYNTERR)
+        return classes, self.comments.first_comment
+
+    # Tokens before lexical error
+    def lex(self, source):
+        try:
+            yield from self.parser.lex(source)
+        except UnexpectedCharacters:
+            return
+
+# Earley parser of lark (it needs installed lark, standalone module contains only LALR), tree is transformed after parse
+# Dynamic lexer does not support lexer callbacks, so the first comment is found in source
+class Lark_Earley_Backend:
+    def __init__(self):
+        import lark
+        self.errors = lark.UnexpectedInput
+        self.transformer = Transform_AST()
+        self.parser = lark.Lark(grammar, parser="earley")
+
+    def parse(self, source, context):
+        self.transformer.start(context)
+        try:
+            tree = self.parser.parse(source)
+        except self.errors as exc:
+            raise ParseError(self.get_error(source, exc))
+        return transform_tree(self.transformer, tree), find_first_comment(source)
+
+    # Dynamic lexer tries terminals at every position, so position of its error is often far behind the real one
+    # (even inside later comment) - lexical or syntax error is told by LALR parser with contextual lexer,
+    # which rejects the same programs (the grammar is the same)
+    def get_error(self, source, exc):
+        try:
+            get_backend(DEFAULT_BACKEND).parse(source, Parse_Context())
+        except ParseError as error:
+            return error.error
+        return get_error(source, exc.pos_in_stream if exc.pos_in_stream >= 0 else len(source))
+
+    # Tokens before lexical error (error of lark package, not of standalone parser imported by this script)
+    def lex(self, source):
+        try:
+            yield from self.parser.lex(source)
+        except self.errors:
+            return
+
+# Grammar of SOL25 for parglare (the same language as grammar of lark, repetitions have their own rules)
+PARGLARE_GRAMMAR = r"""
+program: class_def*;
+class_def: CLASS cid COLON cid LBRACE method RBRACE;
+method: method_def*;
+method_def: selector block;
+selector: id | id_dot+;
+block: LBRACKET block_par BAR block_stat RBRACKET;
+block_par: param*;
+param: COLON id;
+block_stat: statement*;
+statement: id ASSIGN expr DOT;
+expr: expr_base expr_tail;
+expr_base: expr_var | expr_class | str_def | int_def | block | expr_paren;
+expr_var: id;
+expr_class: cid;
+expr_paren: LPAREN expr RPAREN;
+expr_tail: id | keyword_arg*;
+keyword_arg: id_dot expr_base;
+LAYOUT: LayoutItem*;
+LayoutItem: WS | COMMENT;
+
+terminals
+cid: /[A-Z][a-zA-Z0-9_]*/;
+id: /[a-z_][a-zA-Z0-9_]*/;
+id_dot: /[a-zA-Z_][a-zA-Z0-9_]*:/;
+int_def: /-?\d+([eE][+-]?\d+)?/;
+str_def: /'[^'\\\n]*(?:\\['n\\][^'\\\n]*)*'/;
+WS: /[ \t\f\r\n]+/;
+COMMENT: /"[^"]*"/;
+CLASS: "class";
+COLON: ":";
+ASSIGN: ":=";
+DOT: ".";
+BAR: "|";
+LBRACE: "{";
+RBRACE: "}";
+LBRACKET: "[";
+RBRACKET: "]";
+LPAREN: "(";
+RPAREN: ")";
+"""
+
+# LR parser of parglare, actions pass the same arguments to Transform_AST as lark does (punctuation is left out)
+class Parglare_Backend:
+    def __init__(self):
+        import parglare
+        self.errors = parglare.ParseError
+        self.comments = Comment_Collector()
+        transformer = self.transformer = Transform_AST()
+        flatten = lambda pairs: [item for pair in pairs for item in pair]
+        actions = {
+            "program": lambda _, nodes: transformer.program(nodes[0]),
+            "class_def": lambda _, nodes: transformer.class_def([nodes[1], nodes[3], nodes[5]]),
+            "method": lambda _, nodes: transformer.method(flatten(nodes[0])),
+            "method_def": lambda _, nodes: (nodes[0], nodes[1]),
+            "selector": [lambda _, nodes: transformer.selector(nodes), lambda _, nodes: transformer.selector(nodes[0])],
+            "block": lambda _, nodes: transformer.block([nodes[1], nodes[3]]),
+            "block_par": lambda _, nodes: transformer.block_par(nodes[0]),
+            "param": lambda _, nodes: nodes[1],
+            "block_stat": lambda _, nodes: transformer.block_stat(flatten(nodes[0])),
+            "statement": lambda _, nodes: (nodes[0], nodes[2]),
+            "expr": lambda _, nodes: transformer.expr(nodes),
+            "expr_base": lambda _, nodes: transformer.expr_base(nodes),
+            "expr_var": lambda _, nodes: transformer.expr_var(nodes),
+            "expr_class": lambda _, nodes: transformer.expr_class(nodes),
+            "expr_paren": lambda _, nodes: transformer.expr_paren([nodes[1]]),
+            "expr_tail": [lambda _, nodes: transformer.expr_tail(nodes), lambda _, nodes: transformer.expr_tail(flatten(nodes[0]))],
+            "keyword_arg": lambda _, nodes: (nodes[0], nodes[1]),
+            "cid": lambda _, value: transformer.cid([value]),
+            "id": lambda _, value: transformer.id([value]),
+            "id_dot": lambda _, value: transformer.id_dot([value]),
+            "int_def": lambda _, value: transformer.int_def([value]),
+            "str_def": lambda _, value: transformer.str_def([value]),
+        }
+        # Parser of layout shares the grammar and resolves its actions again, so it gets all of them
+        layout_actions = dict(actions, COMMENT=lambda _, value: self.comments(value))
+        self.parser = parglare.Parser(parglare.Grammar.from_string(PARGLARE_GRAMMAR), actions=actions, layout_actions=layout_actions)
+
+    def parse(self, source, context):
+        self.comments.reset()
+        self.transformer.start(context)
+        try:
+            classes = self.parser.parse(source)
+        except self.errors as exc:
+            raise ParseError(get_error(source, exc.location.start_position))
+        return classes, self.comments.first_comment
+
+# Parser combinators of parsy (recursive descent, so nesting of program is limited by recursion limit of Python)
+class Parsy_Backend:
+    def __init__(self):
+        import parsy
+        self.errors = parsy.ParseError
+        transformer = self.transformer = Transform_AST()
+        layout = parsy.regex(LAYOUT_RE)
+        token = lambda pattern: parsy.regex(pattern) << layout
+        literal = lambda text: parsy.string(text) << layout
+        flatten = lambda pairs: [item for pair in pairs for item in pair]
+
+        cid = token(r"[A-Z][a-zA-Z0-9_]*").map(lambda value: transformer.cid([value]))
+        id = token(r"[a-z_][a-zA-Z0-9_]*").map(lambda value: transformer.id([value]))
+        id_dot = token(r"[a-zA-Z_][a-zA-Z0-9_]*:").map(lambda value: transformer.id_dot([value]))
+        int_def = token(r"-?\d+([eE][+-]?\d+)?").map(lambda value: transformer.int_def([value]))
+        str_def = token(STRING_PATTERN).map(lambda value: transformer.str_def([value]))
+
+        expr = parsy.forward_declaration()
+        statement = parsy.seq(id << literal(":="), expr << literal("."))
+        block = parsy.seq(literal("[") >> (literal(":") >> id).many().map(transformer.block_par),
+                          literal("|") >> statement.many().map(lambda pairs: transformer.block_stat(flatten(pairs))) << literal("]"))
+        block = block.map(transformer.block)
+        expr_base = (id.map(lambda value: transformer.expr_var([value]))
+                     | cid.map(lambda value: transformer.expr_class([value]))
+                     | str_def | int_def | block
+                     | (literal("(") >> expr << literal(")")).map(lambda value: transformer.expr_paren([value])))
+        # Keyword selector has to be tried before unary one (identifier is prefix of identifier with colon)
+        expr_tail = (parsy.seq(id_dot, expr_base).at_least(1).map(flatten)
+                     | id.map(lambda value: [value])
+                     | parsy.success([]))
+        expr.become(parsy.seq(expr_base, expr_tail.map(transformer.expr_tail)).map(transformer.expr))
+        selector = id_dot.at_least(1).map(transformer.selector) | id.map(lambda value: transformer.selector([value]))
+        method = parsy.seq(selector, block).many().map(lambda pairs: transformer.method(flatten(pairs)))
+        class_def = parsy.seq(literal("class") >> cid, literal(":") >> cid, literal("{") >> method << literal("}"))
+        self.parser = layout >> class_def.map(transformer.class_def).many().map(transformer.program)
+
+    def parse(self, source, context):
+        self.transformer.start(context)
+        try:
+            classes = self.parser.parse(source)
+        except self.errors as exc:
+            raise ParseError(get_error(source, exc.index))
+        return classes, find_first_comment(source)
+
+# Terminals of grammar for hand-written lexer, the order is the order of lark (it tries alternatives in this order,
+# so identifier with colon wins over identifier and ":=" wins over ":")
+# String literal is the only terminal starting with apostrophe, it goes first because every step of its loop saves
+# marks of all groups opened before it
+DESCENT_TERMINALS = {
+    "STR": STRING_PATTERN,
+    "ID_DOT": r"[a-zA-Z_][a-zA-Z0-9_]*:",
+    "INT": r"-?\d+(?:[eE][+-]?\d+)?",
+    "ID": r"[a-z_][a-zA-Z0-9_]*",
+    "CID": r"[A-Z][a-zA-Z0-9_]*",
+    "CLASS": r"class",
+    "ASSIGN": r":=",
+    "COLON": r":",
+    "DOT": r"\.",
+    "VBAR": r"\|",
+    "LBRACE": r"\{",
+    "RBRACE": r"\}",
+    "LSQB": r"\[",
+    "RSQB": r"\]",
+    "LPAR": r"\(",
+    "RPAR": r"\)",
+}
+# Terminals accepted after the previous terminal - contextual lexer of lark reads only terminals which the parser
+# (with lookaheads of LALR states) accepts, colon of class header and colon of parameter are followed differently
+DESCENT_ACCEPTS = {
+    "START": ("CLASS",),
+    "CLASS": ("CID",),
+    "CID": ("ID_DOT", "ID", "COLON", "DOT", "LBRACE", "RPAR"),
+    "CLASS_COLON": ("CID",),
+    "COLON": ("ID",),
+    "LBRACE": ("ID_DOT", "ID", "RBRACE"),
+    "RBRACE": ("CLASS",),
+    "ID": ("ID_DOT", "ID", "ASSIGN", "COLON", "DOT", "VBAR", "LSQB", "RPAR"),
+    "ID_DOT": ("ID_DOT", "INT", "ID", "CID", "STR", "LSQB", "LPAR"),
+    "INT": ("ID_DOT", "ID", "DOT", "RPAR"),
+    "STR": ("ID_DOT", "ID", "DOT", "RPAR"),
+    "RPAR": ("ID_DOT", "ID", "DOT", "RPAR"),
+    "LSQB": ("COLON", "VBAR"),
+    "VBAR": ("ID", "RSQB"),
+    "RSQB": ("ID_DOT", "ID", "DOT", "RBRACE", "RPAR"),
+    "ASSIGN": ("INT", "ID", "CID", "STR", "LSQB", "LPAR"),
+    "LPAR": ("INT", "ID", "CID", "STR", "LSQB", "LPAR"),
+    "DOT": ("ID", "RSQB"),
+}
+# Layout before terminal is skipped by the same match (every character of layout belongs to one part of pattern,
+# so failed match backtracks only linearly)
+DESCENT_LAYOUT = r'[ \t\f\r\n]*(?:"[^"]*"[ \t\f\r\n]*)*'
+DESCENT_RES = {state: re.compile(DESCENT_LAYOUT + "(?:" + "|".join(f"(?P<{name}>{DESCENT_TERMINALS[name]})"
+                                 for name in sorted(accepts, key=list(DESCENT_TERMINALS).index)) + ")")
+               for state, accepts in DESCENT_ACCEPTS.items()}
+COMMENT_RE = re.compile(r'"[^"]*"')
+
+# Hand-written parser - contextual lexer over source and recursive descent over tokens, it reads the same
+# terminals as lark and fails at the same terminal, so exit codes are the same as exit codes of lark LALR
+# Nodes are created by callbacks of Transform_AST (callbacks which only return their argument are left out)
+# Program nested deeper than recursion limit allows is parsed by lark LALR
+class Descent_Backend:
+    def __init__(self):
+        self.transformer = Transform_AST()
+
+    def parse(self, source, context):
+        self.transformer.start(context)
+        self.source = source
+        self.pos = 0
+        self.state = "START"
+        self.first_comment = ""
+        self.isFound = False
+        try:
+            self.advance()
+            classes = self.parse_program()
+        except RecursionError:
+            context.reset()
+            return get_backend(DEFAULT_BACKEND).parse(source, context)
+        return classes, self.first_comment
+
+    # Reads the next terminal into kind and value (kind "$END" at the end of source)
+    def advance(self):
+        source = self.source
+        pos = self.pos
+        match = DESCENT_RES[self.state].match(source, pos)
+        if(match is None):
+            end = LAYOUT_RE.match(source, pos).end()
+            if(end < len(source)):
+                raise ParseError(get_terminal_error(source, end))
+            start = end
+            self.kind = "$END"
+            self.value = ""
+        else:
+            kind = match.lastgroup
+            start, end = match.span(kind)
+            if((kind == "COLON") and (self.state == "CID")):
+                self.state = "CLASS_COLON"
+            else:
+                self.state = kind
+            self.kind = kind
+            self.value = source[start:end]
+        if((self.isFound == False) and (start != pos)):
+            comment = COMMENT_RE.search(source, pos, start)
+            if(comment is not None):
+                self.first_comment = comment.group()
+                self.isFound = True
+        self.pos = end
+
+    # Returns value of terminal of given kind and reads the next one
+    def expect(self, kind):
+        if(self.kind != kind):
+            raise ParseError(Error.SYNTERR)
+        value = self.value
+        self.advance()
+        return value
+
+    def parse_program(self):
+        classes = []
+        while self.kind == "CLASS":
+            classes.append(self.parse_class())
+        self.expect("$END")
+        return self.transformer.program(classes)
+
+    def parse_class(self):
+        transformer = self.transformer
+        self.advance()
+        name = transformer.cid([self.expect("CID")])
+        self.expect("COLON")
+        parent = transformer.cid([self.expect("CID")])
+        self.expect("LBRACE")
+        args = []
+        while (self.kind == "ID") or (self.kind == "ID_DOT"):
+            args.append(self.parse_selector())
+            args.append(self.parse_block())
+        methods = transformer.method(args)
+        self.expect("RBRACE")
+        return transformer.class_def([name, parent, methods])
 
-    # Create the parser
-    parser = Lark(grammar, parser="lalr")
-    # Create the parser for comments (basicly unnecessary but i made it at the beginning)
-    parser_comment = Lark(grammar_comment, parser="lalr")
+    def parse_selector(self):
+        transformer = self.transformer
+        if(self.kind == "ID"):
+            return transformer.selector([transformer.id([self.expect("ID")])])
+        parts = []
+        while self.kind == "ID_DOT":
+            parts.append(transformer.id_dot([self.expect("ID_DOT")]))
+        return transformer.selector(parts)
 
-    # Creation of AST and aslo check lexical and syntactic analysis
+    def parse_block(self):
+        transformer = self.transformer
+        self.expect("LSQB")
+        parameters = []
+        while self.kind == "COLON":
+            self.advance()
+            parameters.append(transformer.id([self.expect("ID")]))
+        self.expect("VBAR")
+        statements = []
+        while self.kind == "ID":
+            statements.append(transformer.id([self.expect("ID")]))
+            self.expect("ASSIGN")
+            statements.append(self.parse_expr())
+            self.expect("DOT")
+        self.expect("RSQB")
+        return transformer.block([parameters, statements])
+
+    def parse_expr(self):
+        transformer = self.transformer
+        base = self.parse_expr_base()
+        tail = []
+        if(self.kind == "ID"):
+            tail.append(transformer.id([self.expect("ID")]))
+        else:
+            while self.kind == "ID_DOT":
+                tail.append(transformer.id_dot([self.expect("ID_DOT")]))
+                tail.append(self.parse_expr_base())
+        return transformer.expr([base, transformer.expr_tail(tail)])
+
+    def parse_expr_base(self):
+        transformer = self.transformer
+        kind = self.kind
+        if(kind == "ID"):
+            return transformer.expr_var([transformer.id([self.expect("ID")])])
+        elif(kind == "CID"):
+            return transformer.expr_class([transformer.cid([self.expect("CID")])])
+        elif(kind == "STR"):
+            return transformer.str_def([self.expect("STR")])
+        elif(kind == "INT"):
+            return transformer.int_def([self.expect("INT")])
+        elif(kind == "LSQB"):
+            return self.parse_block()
+        self.expect("LPAR")
+        expr = self.parse_expr()
+        self.expect("RPAR")
+        return transformer.expr_paren([expr])
+
+BACKENDS = {"lark-lalr": Lark_LALR_Backend, "lark-earley": Lark_Earley_Backend, "parglare": Parglare_Backend, "parsy": Parsy_Backend,
+            "descent": Descent_Backend}
+
+# Backends are shared by all parses of one thread (comment collector and transformer are bound to the parser)
+thread_parsers = threading.local()
+# Returns backend of current thread, it is created by the first use
+def get_backend(name = DEFAULT_BACKEND):
+    backends = getattr(thread_parsers, "backends", None)
+    if(backends is None):
+        backends = thread_parsers.backends = {}
+    if(name not in backends):
+        backends[name] = BACKENDS[name]()
+    return backends[name]
+
+# Description of program is the first comment without quotation marks
+def get_description(comment):
+    if(len(comment) > 2):
+        return comment[1:-1]
+    return comment
+
+# Attributes of root element
+def get_program_attrib(description):
+    if(description != ""):
+        return {"language": "SOL25", "description": str(description)}
+    return {"language": "SOL25"}
+
+# Parses SOL25 source code and writes XML (or other output format, binary one into binary stream) into stream out
+# class by class, returns description of program
+# Error is raised as ParseError with Error code (part of XML can be already written)
+# Phases are measured into stats (Parse_Stats) when they are given
+def write_sol25(source, out, stats = None, backend_name = DEFAULT_BACKEND, output_format = "xml"):
+    phase = nullcontext if stats is None else stats.phase
+    context = Parse_Context()
+
+    # AST of classes is created during lexical and syntactic analysis
     try:
-        tree = parser.parse(data)
-        tree_comment = parser_comment.parse(data)
-    except UnexpectedCharacters:
-        sys.exit(print_err_by_errnum(Error.LEXERR.value))
-    except UnexpectedToken:
-        sys.exit(print_err_by_errnum(Error.SYNTERR.value))
-    except:
-        sys.exit(print_err_by_errnum(Error.INTERNERR.value))
+        backend = get_backend(backend_name)
+        if(stats is not None):
+            count_tokens(backend, source, stats)
+        with phase("parse"):
+            classes, first_comment = backend.parse(source, context)
+    except ParseError:
+        raise
+    except Exception:
+        raise ParseError(Error.INTERNERR)
+    description = get_description(first_comment)
+    if(stats is not None):
+        stats.count_ast(classes)
         
-    # Helps to have overview over the AST when you are in debug mode
+    # Helps to have overview over the classes when you are in debug mode
     if(isdebug):
         with open("./OUTPUTS/2.txt", "w") as file:
-            file.write(tree_comment.pretty() + "\n")
+            file.write(first_comment + "\n")
             file.write("--------------//----------------\n")
-            file.write(tree.pretty())
-    # Transform AST into XML
-    try:
-        comment_transformer = Transform_Comments()
-        try:
-            first_comment = str(comment_transformer.transform(tree_comment))
-        except:
-            first_comment = ""
-        
-        # First preview of AST for save important information
-        visitor = Visitor_AST()
-        visitor.visit(tree)
-        
-        # Transform AST into XML
-        transformer = Transform_XML(first_comment)
-        xml_tree = transformer.transform(tree)
-        xml_str = ET.tostring(xml_tree, encoding="unicode")
+            debug_writer = XML_Writer(file, get_program_attrib(description))
+            for class_def in classes:
+                debug_writer.write_class(class_def)
+            debug_writer.end()
+
+    if(context.error is not None):
+        raise SemanticException(context.error)
         
-        # Check XML for syntax and semantics
-        visitor = Visitor_XML()
-        visitor.traverse(xml_tree)
+    # Every class is checked for syntax and semantics while it is written and then it is released
+    with phase("check+write"):
+        visitor = Visitor_AST(context)
+        writer = WRITERS[output_format](out, get_program_attrib(description))
+        classes.reverse()
+        while classes:
+            writer.write_class(classes.pop(), visitor)
         
         if((visitor.isMain == False) or (visitor.isRun == False)):
-            sys.exit(print_err_by_errnum(Error.SEMERRMAIN.value))
-    except SyntacticException:
-        sys.exit(print_err_by_errnum(Error.SYNTERR.value))
-    except SemanticException:
-        sys.exit(print_err_by_errnum(visitor.errNum))
+            raise SemanticException(Error.SEMERRMAIN)
+        writer.end()
+    return description
+
+# Lexing is measured by separate pass of lexer over source (parser lexes on demand, so its lexing cannot be
+# separated), it is done only for statistics (lex of backend stops before lexical error)
+def count_tokens(backend, source, stats):
+    if(not hasattr(backend, "lex")):
+        return
+    tokens = 0
+    with stats.phase("lex"):
+        for token in backend.lex(source):
+            tokens += 1
+    stats.count("tokens", tokens)
+
+# Parses SOL25 source code, returns Result with XML as string and raises ParseError with Error code on error
+# All tables of analysis are owned by this call, so it can be used repeatedly (also from more threads)
+def parse_sol25(source: str, backend_name: str = DEFAULT_BACKEND) -> Result:
+    out = io.StringIO()
+    description = write_sol25(source, out, backend_name=backend_name)
+    return Result(out.getvalue(), description)
+
+# Cache of results of parse.py - entry is found by hash of source, grammar and version of parser, so changed
+# source or parser never gets the old result; it contains exit code (first line) and output of correct program
+# Entry is written into temporary file and renamed, so processes sharing the directory never read half written
+# entry; the oldest entries by modification time (it is updated by every hit) are removed when the limit is exceeded
+# Cache never ends the script with error, entry which cannot be read or written is taken as missing
+class Output_Cache:
+    SUFFIX = ".sol25out"
+    TMP_PREFIX = ".tmp"
+
+    def __init__(self, directory, max_size = OUTPUT_CACHE_SIZE << 20):
+        self.directory = directory
+        self.max_size = max_size
+        # Size of directory is unknown until the first write
+        self.size = None
+        self.writes = 0
+        try:
+            os.makedirs(directory, exist_ok=True)
+        except OSError:
+            pass
+        with open(__file__, "rb") as filein:
+            code_digest = hashlib.sha256(filein.read()).hexdigest()
+        self.version = f"{grammar}\0{lark_version}\0{code_digest}\0".encode("utf-8")
+
+    # Key of entry for source parsed by backend (backends can differ in exit codes of some wrong programs)
+    # into output format
+    def get_key(self, source, backend_name = DEFAULT_BACKEND, output_format = "xml"):
+        digest = hashlib.sha256(self.version)
+        digest.update(f"{backend_name}\0{output_format}\0".encode("utf-8"))
+        digest.update(source.encode("utf-8", errors="surrogatepass"))
+        return digest.hexdigest()
+
+    def get_path(self, key):
+        return os.path.join(self.directory, f"{key}{self.SUFFIX}")
+
+    # Returns exit code of entry (output of correct program is written into out) or None when entry is missing
+    # Binary output is read from entry and written into out as bytes
+    def load(self, key, out, binary = False):
+        path = self.get_path(key)
+        try:
+            if(binary):
+                with open(path, "rb") as filein:
+                    content = filein.read()
+                header, _, xml = content.partition(b"\n")
+            else:
+                with open(path, "r", encoding="utf-8", errors="surrogateescape") as filein:
+                    content = filein.read()
+                header, _, xml = content.partition("\n")
+            code = int(header)
+        except (OSError, ValueError):
+            return None
+        # Time of the last use for eviction (entry of another user can be read only)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        if(code == 0):
+            out.write(xml)
+        return code
+
+    # Saves exit code and output read from filein (only exit code of program with error)
+    def store(self, key, code, filein = None, binary = False):
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=self.TMP_PREFIX)
+        except OSError:
+            return
+        try:
+            with (open(fd, "wb") if binary else open(fd, "w", encoding="utf-8", errors="surrogateescape")) as fileout:
+                fileout.write(f"{code}\n".encode("ascii") if binary else f"{code}\n")
+                if(filein is not None):
+                    shutil.copyfileobj(filein, fileout)
+            size = os.stat(tmp_path).st_size
+            os.replace(tmp_path, self.get_path(key))
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        if(self.size is None):
+            self.evict()
+            return
+        self.size += size
+        self.writes += 1
+        if((self.size > self.max_size) or (self.writes >= CACHE_SCAN_INTERVAL)):
+            self.evict()
+
+    # Measures size of directory and removes the least recently used entries when it is over the limit
+    def evict(self):
+        entries = []
+        total = 0
+        now = time.time()
+        try:
+            with os.scandir(self.directory) as scan:
+                for entry in scan:
+                    try:
+                        stat = entry.stat()
+                        if(entry.name.startswith(self.TMP_PREFIX)):
+                            if(now - stat.st_mtime > CACHE_TMP_AGE):
+                                os.remove(entry.path)
+                        elif(entry.name.endswith(self.SUFFIX)):
+                            entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                            total += stat.st_size
+                    except OSError:
+                        continue
+        except OSError:
+            return
+        if(total > self.max_size):
+            entries.sort()
+            for _, size, path in entries:
+                if(total <= self.max_size * CACHE_LOW_WATER):
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    # Other process has removed it already
+                    pass
+                except OSError:
+                    continue
+                total -= size
+        self.size = total
+        self.writes = 0
+
+# Backend, output format and output cache used by parse_batch_file in this process (set by init_batch_worker)
+batch_backend = DEFAULT_BACKEND
+batch_format = "xml"
+batch_cache = None
+# Backend of batch worker process is created only once for every process of pool
+def init_batch_worker(backend_name = DEFAULT_BACKEND, cache_dir = None, cache_size = OUTPUT_CACHE_SIZE << 20, output_format = "xml"):
+    global batch_backend
+    global batch_format
+    global batch_cache
+    batch_backend = backend_name
+    batch_format = output_format
+    batch_cache = None if cache_dir is None else Output_Cache(cache_dir, cache_size)
+    get_backend(backend_name)
+
+# Parses one file of batch and writes XML next to the others, returns exit code of file
+def parse_batch_file(job):
+    in_path, out_path = job
+    # Output of another source file has the same name
+    if(out_path is None):
+        return Error.OUTFILEERR.value
+    try:
+        with open(in_path, "r", encoding="utf-8") as filein:
+            data = filein.read()
+    except (OSError, UnicodeDecodeError):
+        return Error.INFILEERR.value
+
+    # XML is written into temporary file which replaces output file only when the parse succeeds
+    tmp_path = f"{out_path}.tmp"
+    isBinary = WRITERS[batch_format].isBinary
+    key = None if batch_cache is None else batch_cache.get_key(data, batch_backend, batch_format)
+    try:
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+        with (open(tmp_path, "w+b") if isBinary else open(tmp_path, "w+", encoding="utf-8")) as fileout:
+            code = None if key is None else batch_cache.load(key, fileout, isBinary)
+            # Error messages of single files are not printed, codes are saved into manifest
+            if(code is None):
+                try:
+                    write_sol25(data, fileout, backend_name=batch_backend, output_format=batch_format)
+                    code = 0
+                except ParseError as exc:
+                    code = exc.code
+                except Exception:
+                    code = Error.INTERNERR.value
+                if((key is not None) and (code == 0)):
+                    fileout.seek(0)
+                    batch_cache.store(key, code, fileout, isBinary)
+                elif((key is not None) and (code != Error.INTERNERR.value)):
+                    batch_cache.store(key, code, binary=isBinary)
+            if((code == 0) and (batch_format == "xml")):
+                fileout.write("\n")
+        if(code == 0):
+            os.replace(tmp_path, out_path)
+        else:
+            os.remove(tmp_path)
+            # XML from older run would not match the manifest
+            if(os.path.exists(out_path)):
+                os.remove(out_path)
+    except OSError:
+        code = Error.OUTFILEERR.value
+    return code
+
+# Returns pairs (input file, output file with suffix) of all source files in directory
+# Output file of source with the same name as the source before it (a.sol after a.SOL25) is None, so it is not
+# parsed and it is reported with error of output file
+def find_batch_jobs(in_dir, out_dir, suffix = ".xml"):
+    jobs = []
+    out_paths = set()
+    for dir_path, dir_names, file_names in os.walk(in_dir):
+        dir_names.sort()
+        for name in sorted(file_names):
+            if(name.lower().endswith(SOURCE_SUFFIXES)):
+                in_path = os.path.join(dir_path, name)
+                rel_path = os.path.relpath(in_path, in_dir)
+                out_path = os.path.join(out_dir, f"{os.path.splitext(rel_path)[0]}{suffix}")
+                if(out_path in out_paths):
+                    out_path = None
+                else:
+                    out_paths.add(out_path)
+                jobs.append((in_path, out_path))
+    return jobs
+
+# Batch mode - parses all source files from in_dir by pool of processes, writes XML files (or other output format)
+# and manifest with exit codes
+def run_batch(in_dir, out_dir, num_jobs, backend_name = DEFAULT_BACKEND, cache_dir = None, cache_size = OUTPUT_CACHE_SIZE << 20, output_format = "xml"):
+    if(not os.path.isdir(in_dir)):
+        sys.exit(print_err_by_errnum(Error.INFILEERR.value))
+    try:
+        os.makedirs(out_dir, exist_ok=True)
+    except OSError:
+        sys.exit(print_err_by_errnum(Error.OUTFILEERR.value))
+
+    jobs = find_batch_jobs(in_dir, out_dir, OUTPUT_SUFFIXES[output_format])
+    if(num_jobs == 1):
+        init_batch_worker(backend_name, cache_dir, cache_size, output_format)
+        codes = [parse_batch_file(job) for job in jobs]
+    else:
+        # Pool of processes is imported only when it is used
+        import multiprocessing
+        # Bigger chunks lower the overhead of passing jobs between processes
+        chunk_size = max(1, len(jobs) // (num_jobs * 8))
+        with multiprocessing.Pool(num_jobs, initializer=init_batch_worker, initargs=(backend_name, cache_dir, cache_size, output_format)) as pool:
+            codes = pool.map(parse_batch_file, jobs, chunksize=chunk_size)
+
+    try:
+        with open(os.path.join(out_dir, "manifest.txt"), "w", encoding="utf-8") as manifest:
+            for (in_path, out_path), code in zip(jobs, codes):
+                manifest.write(f"{code}\t{os.path.relpath(in_path, in_dir)}\n")
+    except OSError:
+        sys.exit(print_err_by_errnum(Error.OUTFILEERR.value))
+    failed = sum(1 for code in codes if code != 0)
+    sys.stderr.write(f"{len(jobs)} files, {failed} with error (manifest: {os.path.join(out_dir, 'manifest.txt')})\n")
+
+# Parses one request of server, returns exit code and XML or error message
+def parse_request(source):
+    try:
+        return 0, parse_sol25(source).xml
+    except ParseError as exc:
+        return exc.code, get_err_message(exc.code)
+    except Exception:
+        return Error.INTERNERR.value, get_err_message(Error.INTERNERR.value)
+
+# Server of parse requests - keeps one warm parser, requests of all clients are parsed in order from bounded queue
+# Request: 4 bytes length (big endian) + source in UTF-8
+# Response: 4 bytes length + 1 byte exit code + XML (exit code 0) or error message in UTF-8
+# Modules of server (asyncio, socket, signal and thread pool) are imported only in server mode, start of the script
+# for one program stays fast
+class Parse_Server:
+    def __init__(self, socket_path):
+        from concurrent.futures import ThreadPoolExecutor
+        self.socket_path = socket_path
+        # Parser is thread local, so all parses run in one thread of executor
+        self.executor = ThreadPoolExecutor(max_workers=1, initializer=get_backend)
+
+    async def worker(self):
+        import asyncio
+        loop = asyncio.get_running_loop()
+        while True:
+            source, future = await self.queue.get()
+            code, text = await loop.run_in_executor(self.executor, parse_request, source)
+            if(not future.cancelled()):
+                future.set_result((code, text))
+            self.queue.task_done()
+
+    async def handle_client(self, reader, writer):
+        import asyncio
+        loop = asyncio.get_running_loop()
+        try:
+            # More requests can be sent through one connection
+            while True:
+                try:
+                    header = await reader.readexactly(4)
+                except asyncio.IncompleteReadError:
+                    break
+                (length,) = struct.unpack(">I", header)
+                data = await reader.readexactly(length)
+                future = loop.create_future()
+                # Full queue stops reading of new requests (clients wait)
+                # Bytes which are not UTF-8 are kept as parse.py keeps them on stdin (surrogateescape)
+                await self.queue.put((data.decode("utf-8", errors="surrogateescape"), future))
+                code, text = await future
+                payload = text.encode("utf-8", errors="surrogateescape")
+                writer.write(struct.pack(">IB", len(payload), code) + payload)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def run(self):
+        import signal
+        import asyncio
+        self.queue = asyncio.Queue(maxsize=SERVE_QUEUE_SIZE)
+        worker = asyncio.create_task(self.worker())
+        server = await asyncio.start_unix_server(self.handle_client, path=self.socket_path)
+        sys.stderr.write(f"Listening on {self.socket_path}\n")
+        # SIGINT and SIGTERM stop the server (socket file is removed by run_server)
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        try:
+            async with server:
+                await stop.wait()
+        finally:
+            worker.cancel()
+
+# Server mode - parser is created before the first request and stays warm
+def run_server(socket_path):
+    import socket
+    import asyncio
+    # Socket left by previous server would block bind
+    if(os.path.exists(socket_path)):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            if(probe.connect_ex(socket_path) == 0):
+                sys.stderr.write(f"Server already listens on {socket_path}\n")
+                sys.exit(print_err_by_errnum(Error.OUTFILEERR.value))
+        os.remove(socket_path)
+    server = Parse_Server(socket_path)
+    server.executor.submit(get_backend).result()
+    try:
+        asyncio.run(server.run())
+    except OSError:
+        sys.exit(print_err_by_errnum(Error.OUTFILEERR.value))
+    finally:
+        server.executor.shutdown()
+        if(os.path.exists(socket_path)):
+            os.remove(socket_path)
+
+# Watch mode (option --watch) - file is translated again after every change, but only its changed classes are parsed
+# Source is split behind every "}" outside comments and string literals (it can end only body of class), every part
+# is parsed as program of its own and its result is kept for the next translation under its text
+# Lexer of lark is in the same state behind "}" as at the start of program, so parts which all parse give the same
+# classes as parse of whole source; when any part fails, whole source is parsed to get the right error
+CLASS_END_RE = re.compile(r'"[^"]*"|' + STRING_PATTERN + r'|\}')
+# Seconds between checks of modification time of watched file
+WATCH_INTERVAL = 0.1
+
+# Returns parts of source, each of them ends with "}" except the last one (which can be empty)
+def split_classes(source):
+    parts = []
+    start = 0
+    for match in CLASS_END_RE.finditer(source):
+        if(match.group() == "}"):
+            parts.append(source[start:match.end()])
+            start = match.end()
+    parts.append(source[start:])
+    return parts
+
+# State of semantic checks between classes (the same as the state of Visitor_AST, variables end with their blocks)
+class Check_State:
+    def __init__(self, context):
+        self.context = context
+        self.isInsideSend = False
+        self.isMain = False
+        self.isRun = False
+        self.LastNameOfMethod = ""
+
+# Visitor which records every answer that checks of one class get from the state left by previous classes
+# or from declarations of the whole program, as long as they stay the same the class gives the same result
+class Tracing_Visitor(Visitor_AST):
+    def __init__(self, state):
+        super().__init__(state.context)
+        self.isInsideSend = state.isInsideSend
+        self.isMain = state.isMain
+        self.LastNameOfMethod = state.LastNameOfMethod
+        self.reads = []
+        self.isSendSet = False
+        self.isSelectorSet = False
+
+    def check_class(self, node):
+        self.reads.append(("parent", node.parent, node.parent in self.context.CLASS_ID))
+        self.reads.append(("isMain", None, self.isMain))
+        super().check_class(node)
+
+    def check_assign(self, node):
+        self.isSendSet = True
+        super().check_assign(node)
+
+    def check_send(self, node):
+        self.isSendSet = True
+        self.isSelectorSet = True
+        super().check_send(node)
+
+    def check_var(self, node):
+        if((node.name == "self") and (self.isSendSet == False)):
+            self.reads.append(("isInsideSend", None, self.isInsideSend))
+        super().check_var(node)
+
+    def check_literal(self, node):
+        if(node.kind == "class"):
+            if(self.isSelectorSet == False):
+                self.reads.append(("LastNameOfMethod", None, self.LastNameOfMethod))
+            answer = self.context.hierarchy.has_selector(node.value, self.LastNameOfMethod)
+            self.reads.append(("selector", (node.value, self.LastNameOfMethod), answer))
+        super().check_literal(node)
+
+# Result of checks of one class - recorded reads, error (or None) and changes of the state
+class Class_Trace:
+    def __init__(self, visitor, error):
+        self.reads = visitor.reads
+        self.error = error
+        self.isInsideSend = visitor.isInsideSend if visitor.isSendSet else None
+        self.LastNameOfMethod = visitor.LastNameOfMethod if visitor.isSelectorSet else None
+        self.isMain = visitor.isMain
+        self.isRun = visitor.isRun
+
+    # True if every recorded read gives the same answer in state
+    def holds(self, state):
+        for kind, key, answer in self.reads:
+            if(kind == "selector"):
+                value = state.context.hierarchy.has_selector(key[0], key[1])
+            elif(kind == "parent"):
+                value = key in state.context.CLASS_ID
+            else:
+                value = getattr(state, kind)
+            if(value != answer):
+                return False
+        return True
+
+    def apply(self, state):
+        if(self.isInsideSend is not None):
+            state.isInsideSend = self.isInsideSend
+        if(self.LastNameOfMethod is not None):
+            state.LastNameOfMethod = self.LastNameOfMethod
+        state.isMain = self.isMain
+        state.isRun = state.isRun or self.isRun
+
+# Parsed part of source - class (None for part without class), semantic error found during its parse,
+# its first comment, XML of class and trace of its last check
+class Source_Part:
+    def __init__(self, text, class_def, error, first_comment):
+        self.text = text
+        self.class_def = class_def
+        self.error = error
+        self.first_comment = first_comment
+        self.xml = None
+        self.trace = None
+
+# Returns parsed part or None when the part is not correct program with at most one class
+def parse_part(text, backend_name = DEFAULT_BACKEND):
+    context = Parse_Context()
+    try:
+        classes, first_comment = get_backend(backend_name).parse(text, context)
+    except Exception:
+        return None
+    if(len(classes) > 1):
+        return None
+    # Class is declared again with the other classes, only errors of its methods and blocks are its own
+    error = context.error if context.error is not Error.SEMERR else None
+    return Source_Part(text, classes[0] if classes else None, error, first_comment)
+
+# Declares classes of parts in the order of source, returns context and the first comment of program
+# Errors found during the parse come in the order of the parse of whole program (the first one is raised)
+def declare_parts(parts):
+    context = Parse_Context()
+    declarer = Transform_AST(context)
+    first_comment = ""
+    for part in parts:
+        if(first_comment == ""):
+            first_comment = part.first_comment
+        if(part.error is not None):
+            context.defer_error(part.error)
+        if(part.class_def is not None):
+            declarer.declare_class(part.class_def)
+    if(context.error is not None):
+        raise SemanticException(context.error)
+    return context, first_comment
+
+# Translator which keeps parts of the last translated source, it has the same results as write_sol25
+class Incremental_Translator:
+    def __init__(self, backend_name = DEFAULT_BACKEND):
+        self.backend_name = backend_name
+        self.parts = {}
+        # Counters of the last translation
+        self.parsed = 0
+        self.checked = 0
+        self.classes = 0
+
+    # Translates source into XML written into out, returns description, error is raised as ParseError
+    def translate(self, source, out):
+        self.parsed = 0
+        self.checked = 0
+        parts = []
+        for text in split_classes(source):
+            part = self.parts.get(text)
+            if(part is None):
+                part = parse_part(text, self.backend_name)
+                self.parsed += 1
+                if(part is None):
+                    # Parts of the last source stay for the next version (with the parts parsed now)
+                    self.parts.update((part.text, part) for part in parts)
+                    self.classes = 0
+                    return write_sol25(source, out, backend_name=self.backend_name)
+            parts.append(part)
+        self.parts = {part.text: part for part in parts}
+        self.classes = sum(1 for part in parts if part.class_def is not None)
+
+        context, first_comment = declare_parts(parts)
+        return write_parts(parts, context, first_comment, out, self.check_part)
+
+    def check_part(self, part, state):
+        self.checked += 1
+        check_part(part, state)
+
+# Checks class of part in state and saves its trace, XML (or record of other output format) is written by the first
+# successful check
+def check_part(part, state, output_format = "xml"):
+    visitor = Tracing_Visitor(state)
+    writer_class = WRITERS[output_format]
+    buffer = io.BytesIO() if writer_class.isBinary else io.StringIO()
+    try:
+        writer_class(buffer, {}).write_nodes(part.class_def, visitor)
+        error = None
+    except ParseError as exc:
+        error = exc.error
+    part.trace = Class_Trace(visitor, error)
+    if((error is None) and (part.xml is None)):
+        part.xml = buffer.getvalue()
+
+# Checks classes of parts in the order of source and writes their XML into out, returns description of program
+# Trace of part is used while it holds, otherwise the class is checked by check(part, state)
+def write_parts(parts, context, first_comment, out, check, output_format = "xml"):
+    state = Check_State(context)
+    for part in parts:
+        if(part.class_def is None):
+            continue
+        if((part.trace is None) or (not part.trace.holds(state))):
+            check(part, state)
+        if(part.trace.error is not None):
+            raise ParseError(part.trace.error)
+        part.trace.apply(state)
+    if((state.isMain == False) or (state.isRun == False)):
+        raise SemanticException(Error.SEMERRMAIN)
+
+    description = get_description(first_comment)
+    writer = WRITERS[output_format](out, get_program_attrib(description))
+    for part in parts:
+        if(part.class_def is not None):
+            writer.write_text(part.xml)
+    writer.end()
+    return description
+
+# Watch mode - XML of every version of file is printed to stdout, exit code and time of translation to stderr
+def run_watch(path, backend_name = DEFAULT_BACKEND):
+    if(not os.path.isfile(path)):
+        sys.exit(print_err_by_errnum(Error.INFILEERR.value))
+    translator = Incremental_Translator(backend_name)
+    last_signature = None
+    try:
+        while True:
+            try:
+                stat = os.stat(path)
+                signature = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                # Editor can replace the file by renaming a new one over it
+                signature = last_signature
+            if(signature != last_signature):
+                last_signature = signature
+                translate_watched(translator, path)
+            time.sleep(WATCH_INTERVAL)
+    except KeyboardInterrupt:
+        pass
+
+# Translates the current version of watched file
+def translate_watched(translator, path):
+    try:
+        with open(path, "r", encoding="utf-8") as filein:
+            data = filein.read()
+    except (OSError, UnicodeDecodeError):
+        print_err_by_errnum(Error.INFILEERR.value)
+        return
+    start = time.perf_counter()
+    out = io.StringIO()
+    try:
+        translator.translate(data, out)
+        code = 0
+    except ParseError as exc:
+        code = exc.code
+    except Exception:
+        code = Error.INTERNERR.value
+    elapsed = time.perf_counter() - start
+    if(code == 0):
+        sys.stdout.write(out.getvalue() + "\n")
+        sys.stdout.flush()
+    else:
+        print_err_by_errnum(code)
+    sys.stderr.write(f"{path}: exit code {code}, {elapsed * 1000:.1f} ms "
+                     f"({translator.parsed} parts parsed, {translator.checked} of {translator.classes} classes checked)\n")
+
+# Parallel translation of one program (option --jobs without --batch) - source is split into parts at class
+# boundaries (split_classes) and groups of consecutive parts (shards) are parsed by pool of processes
+# Worker checks classes of its shard as in correct program (every class and selector exists, the first class
+# starts in the initial state) and sends back their XML, traces of checks and declarations only (AST stays there)
+# Main process declares the classes in the order of source and checks the traces like watch mode, class whose trace
+# does not hold is parsed and checked again; when any part fails, whole source is parsed by write_sol25
+# Smaller sources are translated in this process (start of the pool would cost more than their parse)
+PARALLEL_MIN_SIZE = 1 << 20
+# Shards per process - more shards balance the load, fewer lower the overhead of passing them
+SHARDS_PER_JOB = 4
+
+# Declarations assumed by checks in worker process (the main process compares them with the real ones)
+class Assumed_Declarations:
+    def __contains__(self, name):
+        return True
+
+    def has_selector(self, name, selector):
+        return True
+
+# Returns shards of source - lists of consecutive parts of about the same size
+def split_shards(source, num_shards):
+    shard_size = len(source) // num_shards + 1
+    shards = [[]]
+    size = 0
+    for text in split_classes(source):
+        if(size >= shard_size):
+            shards.append([])
+            size = 0
+        shards[-1].append(text)
+        size += len(text)
+    return shards
+
+# Parses and checks parts of shard in worker process (backend is set by init_batch_worker), returns list
+# of Source_Part with declaration of class (methods without blocks) or None when any part fails
+def parse_shard(texts):
+    context = Parse_Context()
+    context.hierarchy = context.CLASS_ID = Assumed_Declarations()
+    state = Check_State(context)
+    parts = []
+    for text in texts:
+        part = parse_part(text, batch_backend)
+        if(part is None):
+            return None
+        class_def = part.class_def
+        if(class_def is not None):
+            check_part(part, state, batch_format)
+            part.trace.apply(state)
+            part.class_def = Class_Def(class_def.name, class_def.parent,
+                                       [Method(method.selector, None) for method in class_def.methods])
+        parts.append(part)
+    return parts
+
+# Parses SOL25 source code by num_jobs processes and writes XML (or other output format) into out, returns
+# description of program (the same results as write_sol25)
+def write_sol25_parallel(source, out, num_jobs, stats = None, backend_name = DEFAULT_BACKEND, output_format = "xml"):
+    if((num_jobs == 1) or (len(source) < PARALLEL_MIN_SIZE)):
+        return write_sol25(source, out, stats, backend_name, output_format)
+    import multiprocessing
+    phase = nullcontext if stats is None else stats.phase
+
+    parts = []
+    isParsed = True
+    with phase("parse"):
+        shards = split_shards(source, num_jobs * SHARDS_PER_JOB)
+        try:
+            with multiprocessing.Pool(num_jobs, initializer=init_batch_worker, initargs=(backend_name, None, 0, output_format)) as pool:
+                for shard_parts in pool.imap(parse_shard, shards):
+                    if(shard_parts is None):
+                        isParsed = False
+                        break
+                    parts.extend(shard_parts)
+        except Exception:
+            raise ParseError(Error.INTERNERR)
+    if(isParsed == False):
+        return write_sol25(source, out, stats, backend_name, output_format)
+    if(stats is not None):
+        stats.count("shards", len(shards))
+        stats.count("classes", sum(1 for part in parts if part.class_def is not None))
+
+    # Class checked with wrong assumptions is parsed again in this process
+    def check_again(part, state):
+        part.class_def = parse_part(part.text, backend_name).class_def
+        check_part(part, state, output_format)
+        if(stats is not None):
+            stats.count("checked_again")
+
+    with phase("check+write"):
+        context, first_comment = declare_parts(parts)
+        return write_parts(parts, context, first_comment, out, check_again, output_format)
+
+def main():
+    global isdebug
+    global input_file
+    
+    options = Argument_parser()
+    if("--serve" in options):
+        run_server(DEFAULT_SOCKET if options["--serve"] is True else options["--serve"])
+        return
+    backend_name = options.get("--backend", DEFAULT_BACKEND)
+    output_format = options.get("--format", "xml")
+    if("--watch" in options):
+        run_watch(options["--watch"], backend_name)
+        return
+    cache_size = int(options.get("--cache-size", OUTPUT_CACHE_SIZE)) << 20
+    if("--batch" in options):
+        num_jobs = int(options.get("--jobs", os.cpu_count() or 1))
+        run_batch(options["--batch"], options["--out"], num_jobs, backend_name, options.get("--cache"), cache_size, output_format)
+        return
+
+    stats = Parse_Stats() if "--stats" in options else None
+    profiler = start_profile() if "--profile" in options else None
+    cache = Output_Cache(options["--cache"], cache_size) if "--cache" in options else None
+    num_jobs = int(options.get("--jobs", 1))
+    try:
+        translate_input(stats, backend_name, cache, num_jobs, output_format)
+    finally:
+        if(profiler is not None):
+            write_profile(profiler, options["--profile"])
+        if(stats is not None):
+            write_stats(stats, options["--stats"], options.get("--stats-file"))
+
+# Translates program from stdin into XML (or other output format) on stdout (error ends the script with its exit code)
+# Result is taken from cache (Output_Cache) and saved into it when it is given, big program is parsed by num_jobs
+# processes
+def translate_input(stats = None, backend_name = DEFAULT_BACKEND, cache = None, num_jobs = 1, output_format = "xml"):
+    isBinary = WRITERS[output_format].isBinary
+    phase = nullcontext if stats is None else stats.phase
+    with phase("read"):
+        data = read_input()
+    if(stats is not None):
+        stats.count("input_chars", len(data))
+    # XML is copied into stdout only when whole program is correct (big outputs are spooled into temporary file)
+    # Bytes of stdin which are not UTF-8 are written back as they were read (as by print into stdout)
+    spool_args = {"mode": "w+b"} if isBinary else {"mode": "w+", "encoding": "utf-8", "errors": "surrogateescape"}
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE, **spool_args) as spool:
+        code = None
+        if(cache is not None):
+            with phase("cache"):
+                key = cache.get_key(data, backend_name, output_format)
+                code = cache.load(key, spool, isBinary)
+            if(stats is not None):
+                stats.count("cache_hit", int(code is not None))
+        if(code is None):
+            try:
+                write_sol25_parallel(data, spool, num_jobs, stats, backend_name, output_format)
+            except ParseError as exc:
+                # Internal error can be caused by the environment, it is not saved
+                if((cache is not None) and (exc.code != Error.INTERNERR.value)):
+                    cache.store(key, exc.code)
+                sys.exit(print_err_by_errnum(exc.code))
+            if(cache is not None):
+                spool.seek(0)
+                cache.store(key, 0, spool, isBinary)
+        elif(code != 0):
+            sys.exit(print_err_by_errnum(code))
         
-    # Print XML into stdio
-    print(xml_str)
+        # Print XML into stdio (binary output is written into stdout as it is)
+        with phase("output"):
+            spool.seek(0)
+            if(isBinary):
+                sys.stdout.flush()
+                shutil.copyfileobj(spool, sys.stdout.buffer)
+            else:
+                shutil.copyfileobj(spool, sys.stdout)
+                if(output_format == "xml"):
+                    print()
+            sys.stdout.flush()
+
+# Profiler modules are imported only when they are used (start of the script stays fast)
+def start_profile():
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+# Profile is saved into file (for pstats/snakeviz) or the most expensive functions are printed to stderr
+def write_profile(profiler, path):
+    import pstats
+    profiler.disable()
+    if(path is not True):
+        try:
+            profiler.dump_stats(path)
+        except OSError:
+            sys.exit(print_err_by_errnum(Error.OUTFILEERR.value))
+        return
+    pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(30)
+
+# Report is written to stderr or into file, stdout contains only XML
+def write_stats(stats, report_format, path):
+    report = stats.to_json() if report_format == "json" else stats.to_text()
+    if(path is None):
+        sys.stderr.write(report + "\n")
+        return
+    try:
+        with open(path, "w", encoding="utf-8") as fileout:
+            fileout.write(report + "\n")
+    except OSError:
+        sys.exit(print_err_by_errnum(Error.OUTFILEERR.value))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
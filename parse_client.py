@@ -0,0 +1,62 @@
+import io
+import os
+import sys
+import socket
+import struct
+import tempfile
+
+# Client of parse.py server (python3.11 parse.py --serve), it is used in the same way as parse.py:
+#   python3.11 parse_client.py < vstup.SOL25 > vystup.xml
+# XML is printed to stdout, error message to stderr and exit code is the same as exit code of parse.py
+# When the server does not run (or options are given), parse.py is run inside this process instead
+
+# Same default as in parse.py
+SOCKET_PATH = os.environ.get("SOL25_SOCKET", os.path.join(tempfile.gettempdir(), f"sol25-{os.getuid()}.sock"))
+
+# Reads exactly size bytes from socket
+def receive_exactly(sock, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if(not chunk):
+            raise ConnectionError("Server closed connection")
+        data.extend(chunk)
+    return bytes(data)
+
+# Sends source to server and returns (exit code, XML or error message)
+# Bytes of stdin which are not UTF-8 are sent as they were read (the same as parse.py gets them on stdin)
+def send_request(sock, source):
+    payload = source.encode("utf-8", errors="surrogateescape")
+    sock.sendall(struct.pack(">I", len(payload)) + payload)
+    length, code = struct.unpack(">IB", receive_exactly(sock, 5))
+    return code, receive_exactly(sock, length).decode("utf-8", errors="surrogateescape")
+
+# Runs parse.py in this process (fallback without server)
+def run_locally():
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import parse
+    parse.main()
+
+def main():
+    if(len(sys.argv) > 1):
+        run_locally()
+        return
+    source = sys.stdin.read()
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(SOCKET_PATH)
+            code, text = send_request(sock, source)
+    except OSError:
+        # Input was already read, so parse.py gets it through new stdin
+        sys.stdin = io.StringIO(source)
+        run_locally()
+        return
+
+    if(code == 0):
+        print(text)
+    else:
+        sys.stderr.write(text)
+    sys.exit(code)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import io
+import os
+import sys
+
+from lark import Lark
+from lark.tools.standalone import gen_standalone
+
+# Generates sol25_parser.py - standalone LALR parser for grammar from parse.py
+# parse.py uses it automatically (without importing lark), when the grammar was not changed since the build
+# Usage: python tools/build_standalone.py [output file]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# Grammar has to be taken from parse.py with Lark (not from older generated module)
+os.environ["SOL25_STANDALONE"] = "0"
+import parse
+
+def main():
+    output_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(ROOT, "sol25_parser.py")
+
+    out = io.StringIO()
+    gen_standalone(Lark(parse.grammar, parser="lalr"), out=out)
+    # Extracted Transformer_NonRecursive uses typing.cast and Lark.lex uses contextlib.suppress,
+    # they are not imported by the generated code
+    out.write("from typing import cast\n")
+    out.write("from contextlib import suppress\n")
+
+    out.write(f"GRAMMAR_DIGEST = {parse.get_grammar_digest()!r}\n")
+
+    # Module is replaced at once, so running parse.py never imports half written file
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, "w") as fileout:
+        fileout.write(out.getvalue())
+    os.replace(tmp_path, output_path)
+    print(f"Generated {os.path.relpath(output_path)}")
+
+if __name__ == "__main__":
+    main()
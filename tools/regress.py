@@ -0,0 +1,150 @@
+import os
+import sys
+import time
+import argparse
+import multiprocessing
+import xml.etree.ElementTree as ET
+
+# Regression test of parse.py against reference outputs - every source file (*.SOL25, *.sol) from INPUTS has
+# expected XML in REFS on the same relative path with suffix .xml and expected exit code in file with suffix .rc
+# (exit code 0 when only XML exists), case without both of them is only reported
+# Cases are parsed by pool of processes (parser is created once for every process) which also compare XML
+# (whitespace between elements and order of attributes are ignored), timing table is printed at the end
+# Usage: python tools/regress.py [INPUTS] [REFS] [--jobs N] [--backend NAME] [--slowest N]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import parse
+
+# Result of one case
+PASSED, FAILED, NO_REF = "ok", "FAIL", "no ref"
+
+# Returns the first difference of XML documents or None when they are the same - elements of both trees are compared
+# in document order (attributes as dictionaries, text without whitespace around it), so it is canonical comparison
+# without writing canonical XML (C14N serializer of ElementTree is slower than parse itself)
+def compare_xml(expected, actual):
+    # Reference written by parse.py itself is the same text
+    if(expected.rstrip("\n") == actual):
+        return None
+    try:
+        expected_root = ET.fromstring(expected)
+    except ET.ParseError as exc:
+        return f"reference XML is not well-formed: {exc}"
+    actual_root = ET.fromstring(actual)
+    for expected_elem, actual_elem in zip(expected_root.iter(), actual_root.iter()):
+        if((expected_elem.tag != actual_elem.tag) or (expected_elem.attrib != actual_elem.attrib)
+           or ((expected_elem.text or "").strip() != (actual_elem.text or "").strip())
+           or ((expected_elem.tail or "").strip() != (actual_elem.tail or "").strip())
+           or (len(expected_elem) != len(actual_elem))):
+            return f"XML differs: expected {format_elem(expected_elem)}, got {format_elem(actual_elem)}"
+    return None
+
+# Start tag of element without its children (for message of difference)
+def format_elem(elem):
+    return ET.tostring(ET.Element(elem.tag, elem.attrib), encoding="unicode")
+
+# Reads expected exit code and XML of case, returns (None, None) when case has no reference
+def read_reference(ref_path):
+    rc_path = f"{os.path.splitext(ref_path)[0]}.rc"
+    xml = None
+    if(os.path.isfile(ref_path)):
+        with open(ref_path, "r", encoding="utf-8") as filein:
+            xml = filein.read()
+    if(os.path.isfile(rc_path)):
+        with open(rc_path, "r") as filein:
+            return int(filein.read().strip()), xml
+    if(xml is None):
+        return None, None
+    return 0, xml
+
+# Runs one case in worker process (backend is set by parse.init_batch_worker), returns
+# (input file, result, exit code, parse time, message)
+def run_case(job):
+    in_path, ref_path = job
+    if(ref_path is None):
+        return in_path, FAILED, None, 0.0, "reference of another input with the same name would be used"
+    try:
+        expected_code, expected_xml = read_reference(ref_path)
+    except (OSError, ValueError, UnicodeDecodeError) as exc:
+        return in_path, FAILED, None, 0.0, f"reference cannot be read: {exc}"
+    try:
+        with open(in_path, "r", encoding="utf-8") as filein:
+            source = filein.read()
+    except (OSError, UnicodeDecodeError):
+        return in_path, FAILED, parse.Error.INFILEERR.value, 0.0, "input cannot be read"
+
+    start = time.perf_counter()
+    xml = None
+    try:
+        xml = parse.parse_sol25(source, parse.batch_backend).xml
+        code = 0
+    except parse.ParseError as exc:
+        code = exc.code
+    except Exception:
+        code = parse.Error.INTERNERR.value
+    elapsed = time.perf_counter() - start
+
+    if(expected_code is None):
+        return in_path, NO_REF, code, elapsed, ""
+    if(code != expected_code):
+        return in_path, FAILED, code, elapsed, f"exit code {code}, expected {expected_code}"
+    # XML is compared only for correct program with reference XML
+    if((code == 0) and (expected_xml is not None)):
+        difference = compare_xml(expected_xml, xml)
+        if(difference is not None):
+            return in_path, FAILED, code, elapsed, difference
+    return in_path, PASSED, code, elapsed, ""
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Regression test of parse.py against reference outputs")
+    arg_parser.add_argument("inputs", nargs="?", default=os.path.join(ROOT, "INPUTS"))
+    arg_parser.add_argument("refs", nargs="?", default=os.path.join(ROOT, "Ref_OUTPUTS"))
+    arg_parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    arg_parser.add_argument("--backend", default=parse.DEFAULT_BACKEND, choices=sorted(parse.BACKENDS))
+    arg_parser.add_argument("--slowest", type=int, default=10, help="number of the slowest cases in table")
+    args = arg_parser.parse_args()
+    if(not os.path.isdir(args.inputs)):
+        sys.exit(f"{args.inputs} is not directory")
+
+    jobs = parse.find_batch_jobs(args.inputs, args.refs)
+    start = time.perf_counter()
+    if(args.jobs == 1):
+        parse.init_batch_worker(args.backend)
+        results = [run_case(job) for job in jobs]
+    else:
+        # Bigger chunks lower the overhead of passing cases between processes
+        chunk_size = max(1, len(jobs) // (args.jobs * 8))
+        with multiprocessing.Pool(args.jobs, initializer=parse.init_batch_worker, initargs=(args.backend,)) as pool:
+            results = pool.map(run_case, jobs, chunksize=chunk_size)
+    wall = time.perf_counter() - start
+
+    # Failures first, then timing table by directories and the slowest cases
+    for in_path, result, code, elapsed, message in results:
+        if(result == FAILED):
+            print(f"{result:<7}{os.path.relpath(in_path, args.inputs)}: {message}")
+    groups = {}
+    for in_path, result, code, elapsed, message in results:
+        group = os.path.dirname(os.path.relpath(in_path, args.inputs)) or "."
+        counts = groups.setdefault(group, {PASSED: 0, FAILED: 0, NO_REF: 0, "time": 0.0, "max": 0.0})
+        counts[result] += 1
+        counts["time"] += elapsed
+        counts["max"] = max(counts["max"], elapsed)
+    print(f"{'directory':<30}{'cases':>7}{'ok':>7}{'failed':>8}{'no ref':>8}{'time [ms]':>12}{'max [ms]':>10}")
+    for group, counts in sorted(groups.items()):
+        cases = counts[PASSED] + counts[FAILED] + counts[NO_REF]
+        print(f"{group:<30}{cases:>7}{counts[PASSED]:>7}{counts[FAILED]:>8}{counts[NO_REF]:>8}"
+              f"{counts['time'] * 1000:>12.1f}{counts['max'] * 1000:>10.1f}")
+    if(args.slowest > 0):
+        print(f"\n{'slowest case':<52}{'exit code':>10}{'time [ms]':>12}")
+        for in_path, result, code, elapsed, message in sorted(results, key=lambda item: -item[3])[:args.slowest]:
+            print(f"{os.path.relpath(in_path, args.inputs):<52}{str(code):>10}{elapsed * 1000:>12.1f}")
+
+    failed = sum(1 for result in results if result[1] == FAILED)
+    no_ref = sum(1 for result in results if result[1] == NO_REF)
+    parse_time = sum(result[3] for result in results)
+    print(f"\n{len(results)} cases, {len(results) - failed - no_ref} passed, {failed} failed, {no_ref} without reference;"
+          f" {wall * 1000:.0f} ms wall time ({args.jobs} processes), {parse_time * 1000:.0f} ms of parse")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()